@@ -0,0 +1,28 @@
+"""
+orjson serializer for Celery task messages and results.
+
+Registered under the name ``orjson`` so both Celery apps (celery_config.py and
+app.tasks.celery_app) can select it while still accepting plain ``json``
+messages from older producers.
+"""
+
+import orjson
+from kombu.serialization import register
+
+ORJSON_CONTENT_TYPE = "application/x-orjson"
+
+
+def _dumps(obj):
+    # OPT_NON_STR_KEYS mirrors stdlib json, which coerces int keys to strings
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+
+def register_orjson_serializer() -> None:
+    """Register the ``orjson`` serializer with kombu (idempotent)."""
+    register(
+        "orjson",
+        _dumps,
+        orjson.loads,
+        content_type=ORJSON_CONTENT_TYPE,
+        content_encoding="binary",
+    )
@@ -23,6 +23,7 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     ENCRYPTION_KEY: str = secrets.token_urlsafe(32)
+    BCRYPT_ROUNDS: int = 12  # bcrypt work factor (log2); tests lower it to the minimum of 4
     
     # Database - Optimized for sub-10ms latency
     DATABASE_URL: str
@@ -111,6 +112,7 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: Optional[str] = None  # Google Gemini API
     GEMINI_MODEL: str = "gemini-2.0-flash"  # Default Gemini model
     GEMINI_MAX_CONCURRENT: int = 5  # Max concurrent Gemini requests
+    GEMINI_MAX_RPS: float = 10.0  # Client-side Gemini request rate cap (0 disables)
     
     # Admin Credentials
     ADMIN_USERNAME: Optional[str] = None
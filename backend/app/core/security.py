@@ -20,7 +20,7 @@ logger = logging.getLogger(__name__)
 
 
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 # Password validation rules
 MIN_PASSWORD_LENGTH = 8
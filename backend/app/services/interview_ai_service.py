@@ -2,6 +2,7 @@
 
 import logging
 import json
+import time
 import asyncio
 from typing import List, Dict, Any, Optional
 from enum import Enum
@@ -65,6 +66,79 @@ TECHNICAL_THEORY_QUESTIONS = {
 }
 
 
+# Final feedback response formats. The scores and coaching halves can be
+# requested separately and merged; FINAL_FEEDBACK_FORMAT asks for both at once
+FINAL_FEEDBACK_SCORES_FORMAT = """{
+  "overall_score": 0-100,
+  "category_scores": {
+    "communication": 0-100,
+    "technical_knowledge": 0-100,
+    "problem_solving": 0-100,
+    "behavioral": 0-100,
+    "professionalism": 0-100
+  },
+  "summary": "2-3 sentence overall summary",
+  "interview_readiness": "ready" | "almost_ready" | "needs_practice"
+}"""
+
+FINAL_FEEDBACK_COACHING_FORMAT = """{
+  "top_strengths": ["strength 1", "strength 2", "strength 3"],
+  "priority_improvements": ["improvement 1", "improvement 2", "improvement 3"],
+  "detailed_feedback": {
+    "communication": "Specific feedback on communication skills",
+    "content": "Specific feedback on answer content and depth",
+    "structure": "Specific feedback on answer structure (STAR method, etc.)",
+    "confidence": "Specific feedback on confidence and delivery"
+  },
+  "recommendations": [
+    "Specific actionable recommendation 1",
+    "Specific actionable recommendation 2",
+    "Specific actionable recommendation 3"
+  ],
+  "next_steps": "What the candidate should focus on next"
+}"""
+
+FINAL_FEEDBACK_FORMAT = FINAL_FEEDBACK_SCORES_FORMAT[:-2] + ",\n" + FINAL_FEEDBACK_COACHING_FORMAT[2:]
+
+
+class AsyncTokenBucket:
+    """
+    Client-side token-bucket rate limiter.
+    
+    Allows bursts of up to `capacity` calls (default: one second's worth, and
+    at least one) and refills at `rate` tokens per
+    second; callers beyond that wait their turn (FIFO) instead of being sent
+    on to hit the provider's 429 and retry with backoff.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        # At least one token, or rates below 1/s could never fill a whole one
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    async def __aenter__(self) -> "AsyncTokenBucket":
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
 class InterviewAIService:
     """
     AI service for conducting mock interviews using Gemini 2.5 Flash.
@@ -75,6 +149,7 @@ class InterviewAIService:
     - Follow-up question generation
     - Final feedback compilation
     - Concurrency control with AsyncIO Semaphore
+    - Request rate limiting with a token bucket
     """
     
     def __init__(self):
@@ -82,6 +157,7 @@ class InterviewAIService:
         self.provider = None
         self.model_name = None
         self._semaphore: Optional[asyncio.Semaphore] = None
+        self._limiter: Optional[AsyncTokenBucket] = None
         self._init_ai()
     
     def _init_ai(self):
@@ -119,7 +195,12 @@ class InterviewAIService:
                 max_concurrent = settings.GEMINI_MAX_CONCURRENT
                 self._semaphore = asyncio.Semaphore(max_concurrent)
                 
-                logger.info(f"Interview AI initialized with Gemini {self.model_name} (max concurrent: {max_concurrent})")
+                # Pace requests below the provider's rate limit
+                max_rps = settings.GEMINI_MAX_RPS
+                if max_rps > 0:
+                    self._limiter = AsyncTokenBucket(rate=max_rps)
+                
+                logger.info(f"Interview AI initialized with Gemini {self.model_name} (max concurrent: {max_concurrent}, max rps: {max_rps})")
                 
             # Fallback to OpenAI if Gemini not available
             elif settings.OPENAI_API_KEY:
@@ -162,6 +243,11 @@ class InterviewAIService:
         if not self.model or self.provider != "gemini":
             raise AIServiceError("Gemini model not initialized")
         
+        # Wait for a rate token before taking a concurrency slot, so queued
+        # callers don't hold slots (and time out others) while paced
+        if self._limiter:
+            await self._limiter.acquire()
+        
         # Apply concurrency control
         if self._semaphore:
             # Try to acquire semaphore with timeout
@@ -597,63 +683,40 @@ Provide analysis in this exact JSON format:
                     "improvements": analysis.get("improvements", [])
                 })
             
-            prompt = f"""Generate comprehensive interview feedback based on this {interview_type.value} interview{"for " + job_role + " role" if job_role else ""}.
+            prompt_head = f"""Generate comprehensive interview feedback based on this {interview_type.value} interview{"for " + job_role + " role" if job_role else ""}.
 
 Interview Summary:
 {json.dumps(interview_summary, indent=2)}
 
 Provide feedback in this exact JSON format:
-{{
-  "overall_score": 0-100,
-  "category_scores": {{
-    "communication": 0-100,
-    "technical_knowledge": 0-100,
-    "problem_solving": 0-100,
-    "behavioral": 0-100,
-    "professionalism": 0-100
-  }},
-  "summary": "2-3 sentence overall summary",
-  "top_strengths": ["strength 1", "strength 2", "strength 3"],
-  "priority_improvements": ["improvement 1", "improvement 2", "improvement 3"],
-  "detailed_feedback": {{
-    "communication": "Specific feedback on communication skills",
-    "content": "Specific feedback on answer content and depth",
-    "structure": "Specific feedback on answer structure (STAR method, etc.)",
-    "confidence": "Specific feedback on confidence and delivery"
-  }},
-  "recommendations": [
-    "Specific actionable recommendation 1",
-    "Specific actionable recommendation 2",
-    "Specific actionable recommendation 3"
-  ],
-  "interview_readiness": "ready" | "almost_ready" | "needs_practice",
-  "next_steps": "What the candidate should focus on next"
-}}"""
-
+"""
             system_instruction = "You are an expert interview coach providing constructive feedback. Return only valid JSON."
             
             if self.provider == "gemini":
-                result_text = await self._call_gemini(prompt, system_instruction, temperature=0.4)
+                # Scores and coaching text are independent halves of the
+                # report; request them concurrently (each through the
+                # semaphore and rate limiter) so the wait is the longer of
+                # two shorter generations rather than one long one
+                score_text, coaching_text = await asyncio.gather(
+                    self._call_gemini(prompt_head + FINAL_FEEDBACK_SCORES_FORMAT, system_instruction, temperature=0.4),
+                    self._call_gemini(prompt_head + FINAL_FEEDBACK_COACHING_FORMAT, system_instruction, temperature=0.4),
+                )
+                feedback = self._parse_json_reply(score_text)
+                feedback.update(self._parse_json_reply(coaching_text))
             else:
                 import openai
                 response = openai.ChatCompletion.create(
                     model=self.model,
                     messages=[
                         {"role": "system", "content": system_instruction},
-                        {"role": "user", "content": prompt}
+                        {"role": "user", "content": prompt_head + FINAL_FEEDBACK_FORMAT}
                     ],
                     temperature=0.4,
                     max_tokens=1500,
                     timeout=30
                 )
-                result_text = response.choices[0].message.content
-            
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0]
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0]
+                feedback = self._parse_json_reply(response.choices[0].message.content)
             
-            feedback = json.loads(result_text)
             logger.info(f"Generated final feedback with overall score: {feedback.get('overall_score', 0)}")
             return feedback
             
@@ -663,6 +726,15 @@ Provide feedback in this exact JSON format:
             logger.error(f"Error generating final feedback: {str(e)}")
             return self._fallback_final_feedback(response_analyses)
     
+    @staticmethod
+    def _parse_json_reply(result_text: str) -> Dict[str, Any]:
+        """Parse a JSON reply, unwrapping a markdown code fence if present"""
+        if "```json" in result_text:
+            result_text = result_text.split("```json")[1].split("```")[0]
+        elif "```" in result_text:
+            result_text = result_text.split("```")[1].split("```")[0]
+        return json.loads(result_text)
+    
     def _fallback_final_feedback(self, analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Fallback feedback when AI is unavailable"""
         # Calculate average scores from individual analyses
@@ -711,6 +783,7 @@ Provide feedback in this exact JSON format:
             "provider": self.provider,
             "model": self.model_name,
             "concurrency_limit": getattr(settings, "GEMINI_MAX_CONCURRENT", 5) if self.provider == "gemini" else None,
+            "rate_limit_rps": self._limiter.rate if self._limiter else None,
         }
 
 
@@ -14,6 +14,7 @@ inside Celery tasks / API requests without shared global state.
 """
 from __future__ import annotations
 
+import heapq
 import logging
 import re
 from typing import List, Dict, Any, Optional, Tuple
@@ -22,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Attempt to import scikit-learn; provide graceful degradation if unavailable.
 try:  # pragma: no cover
+    import numpy as np  # type: ignore
     from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
     from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
     _SKLEARN_AVAILABLE = True
@@ -271,15 +273,14 @@ class JobMatchingService:
         job_vecs = matrix[1:]
         similarities = cosine_similarity(profile_vec, job_vecs)[0]
 
-        # Rank jobs by similarity
-        ranked = sorted(
-            enumerate(similarities), key=lambda x: x[1], reverse=True
-        )[:top_n]
+        # Rank jobs by similarity in numpy; a stable sort on the negated scores
+        # keeps listing order for ties, as sorted(..., reverse=True) did
+        ranked = np.argsort(-similarities, kind="stable")[:top_n]
 
         results: List[Dict[str, Any]] = []
-        for idx, score in ranked:
+        for idx in ranked:
             job = dict(job_listings[idx])  # shallow copy
-            job["match_score"] = round(float(score * 100), 2)  # percentage-like
+            job["match_score"] = round(float(similarities[idx] * 100), 2)  # percentage-like
             results.append(job)
         return results
 
@@ -291,11 +292,12 @@ class JobMatchingService:
         job_listings: List[Dict[str, Any]],
         top_n: int,
     ) -> List[Dict[str, Any]]:
-        profile_set = set(k.lower() for k in (resume_keywords + resume_skills))
+        profile_set = frozenset(k.lower() for k in (resume_keywords + resume_skills))
         if not profile_set:
-            profile_set = {"generic"}
+            profile_set = frozenset({"generic"})
+        score_scale = 100.0 / len(profile_set)
 
-        scored: List[Dict[str, Any]] = []
+        scores: List[float] = []
         for job in job_listings:
             skills_field = job.get("skills", [])
             if isinstance(skills_field, list):
@@ -303,15 +305,17 @@ class JobMatchingService:
             else:
                 job_tokens = set(str(skills_field).lower().split())
 
-            overlap = profile_set.intersection(job_tokens)
-            score = (len(overlap) / max(len(profile_set), 1)) * 100.0
-            entry = dict(job)
-            entry["match_score"] = round(score, 2)
-            scored.append(entry)
+            scores.append(round(len(profile_set.intersection(job_tokens)) * score_scale, 2))
 
-        # Rank & slice
-        scored.sort(key=lambda j: j["match_score"], reverse=True)
-        return scored[:top_n]
+        # Rank & slice: nlargest matches a stable descending sort, and only the
+        # jobs that make the cut are copied
+        ranked = heapq.nlargest(top_n, range(len(scores)), key=scores.__getitem__)
+        results: List[Dict[str, Any]] = []
+        for idx in ranked:
+            entry = dict(job_listings[idx])
+            entry["match_score"] = scores[idx]
+            results.append(entry)
+        return results
 
 
 # Utility function for external use
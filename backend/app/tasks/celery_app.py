@@ -3,6 +3,9 @@
 from celery import Celery
 from celery.schedules import crontab
 from app.core.config import settings
+from app.core.celery_serialization import register_orjson_serializer
+
+register_orjson_serializer()
 
 # Create Celery app
 celery_app = Celery(
@@ -19,9 +22,11 @@ celery_app = Celery(
 
 # Configure Celery
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer='orjson',
+    accept_content=['orjson', 'json'],
+    result_serializer='orjson',
+    result_expires=3600,  # Results are not read back; don't let them pile up in Redis
+    result_extended=False,
     timezone='Asia/Kolkata',  # IST timezone
     enable_utc=False,  # Use local time
     task_track_started=True,
@@ -29,6 +34,15 @@ celery_app.conf.update(
     task_soft_time_limit=240,  # 4 minutes soft limit
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # RedBeat keeps each schedule entry in its own Redis hash, so beat only
+    # touches entries that are due instead of rewriting a shelve file.
+    # Only this app (the one the celery-beat service runs) uses it: RedBeat
+    # prunes static entries missing from the running app's beat_schedule,
+    # so a second app on the same prefix would delete these jobs
+    beat_scheduler='redbeat.RedBeatScheduler',
+    redbeat_redis_url=settings.CELERY_BROKER_URL,
+    redbeat_key_prefix='applyx:beat:',
+    redbeat_lock_timeout=300,
 )
 
 # Celery Beat schedule for automated tasks
@@ -45,3 +59,18 @@ celery_app.conf.beat_schedule = {
         'schedule': crontab(minute=30),
     },
 }
+
+
+def add_scrape_schedule(name: str, task: str, schedule, kwargs: dict = None):
+    """
+    Register or replace a beat entry at runtime.
+
+    The static beat_schedule above is synced into Redis when beat starts;
+    entries saved here are picked up on the scheduler's next tick without
+    a restart (e.g. a new keyword batch).
+    """
+    from redbeat import RedBeatSchedulerEntry
+
+    entry = RedBeatSchedulerEntry(name, task, schedule, kwargs=kwargs or {}, app=celery_app)
+    entry.save()
+    return entry
@@ -6,7 +6,9 @@ Filters: Software Engineering roles ONLY (no HR, Sales, Marketing, etc.)
 import logging
 import requests
 from celery import shared_task
-from typing import List
+from sqlalchemy import insert, or_
+from sqlalchemy.exc import DataError, IntegrityError
+from typing import Dict, List
 from app.core.config import settings
 from app.db.database import SessionLocal
 from app.models.job import Job
@@ -41,7 +43,64 @@ def is_engineering_job(title: str) -> bool:
     return any(eng in title_lower for eng in ENGINEERING_TITLES)
 
 
-@shared_task(name='app.tasks.scraping_tasks.scrape_linkedin_jobs')
+# Rows per INSERT executemany; bounds statement size for large Zyte pulls
+BULK_INSERT_BATCH_SIZE = 500
+
+
+def insert_new_jobs(db, rows: List[Dict]) -> int:
+    """
+    Insert job rows that are not already stored, using one executemany.
+
+    A row is a duplicate when its source_url or its (title, company) pair is
+    already in the jobs table or earlier in ``rows``. Existing jobs are looked
+    up with one query for the whole batch rather than one SELECT per item.
+    Each batch runs in a savepoint; if a row in it is rejected, that batch is
+    retried row by row so only the bad rows are dropped.
+    Returns the number of rows inserted; the caller commits.
+    """
+    if not rows:
+        return 0
+    
+    urls = {row['source_url'] for row in rows if row.get('source_url')}
+    titles = {row['title'] for row in rows}
+    existing = db.query(Job.source_url, Job.title, Job.company).filter(
+        or_(Job.source_url.in_(urls), Job.title.in_(titles))
+    ).all()
+    seen_urls = {url for url, _, _ in existing if url}
+    seen_pairs = {(title, company) for _, title, company in existing}
+    
+    new_rows = []
+    for row in rows:
+        url = row.get('source_url')
+        pair = (row['title'], row['company'])
+        if (url and url in seen_urls) or pair in seen_pairs:
+            continue
+        if url:
+            seen_urls.add(url)
+        seen_pairs.add(pair)
+        new_rows.append(row)
+    
+    inserted = 0
+    for start in range(0, len(new_rows), BULK_INSERT_BATCH_SIZE):
+        batch = new_rows[start:start + BULK_INSERT_BATCH_SIZE]
+        try:
+            with db.begin_nested():
+                db.execute(insert(Job), batch)
+            inserted += len(batch)
+            continue
+        except (IntegrityError, DataError) as e:
+            logger.warning(f"Batch insert failed, retrying row by row: {str(e)}")
+        for row in batch:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(Job), [row])
+                inserted += 1
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Error storing job '{row['title']}': {str(e)}")
+    return inserted
+
+
+@shared_task(name='app.tasks.scraping_tasks.scrape_linkedin_jobs', ignore_result=True)
 def scrape_linkedin_jobs(keywords: List[str], job_count: int = 10):
     """Trigger LinkedIn spider for engineering jobs"""
     logger.info(f"Starting LinkedIn engineering job scrape: {job_count} jobs")
@@ -69,7 +128,7 @@ def scrape_linkedin_jobs(keywords: List[str], job_count: int = 10):
     return {"status": "triggered", "spider": "linkedin", "keywords": keywords}
 
 
-@shared_task(name='app.tasks.scraping_tasks.scrape_indeed_jobs')
+@shared_task(name='app.tasks.scraping_tasks.scrape_indeed_jobs', ignore_result=True)
 def scrape_indeed_jobs(keywords: List[str], job_count: int = 50):
     """Trigger Indeed spider for engineering jobs"""
     logger.info(f"Starting Indeed engineering job scrape: {job_count} jobs")
@@ -97,7 +156,7 @@ def scrape_indeed_jobs(keywords: List[str], job_count: int = 50):
     return {"status": "triggered", "spider": "indeed", "keywords": keywords}
 
 
-@shared_task(name='app.tasks.scraping_tasks.scrape_naukri_jobs')
+@shared_task(name='app.tasks.scraping_tasks.scrape_naukri_jobs', ignore_result=True)
 def scrape_naukri_jobs(keywords: List[str], job_count: int = 10):
     """Trigger Naukri spider for engineering jobs"""
     logger.info(f"Starting Naukri engineering job scrape: {job_count} jobs")
@@ -125,7 +184,7 @@ def scrape_naukri_jobs(keywords: List[str], job_count: int = 10):
     return {"status": "triggered", "spider": "naukri", "keywords": keywords}
 
 
-@shared_task(name='app.tasks.scraping_tasks.fetch_and_store_jobs')
+@shared_task(name='app.tasks.scraping_tasks.fetch_and_store_jobs', ignore_result=True)
 def fetch_and_store_jobs(job_id: str):
     """
     Fetch scraped jobs from Scrapy Cloud and store ONLY engineering jobs in database
@@ -141,8 +200,9 @@ def fetch_and_store_jobs(job_id: str):
             jobs_data = response.json()
             db = SessionLocal()
             
-            stored_count = 0
             filtered_count = 0
+            rows = []
+            scraped_at = datetime.utcnow()
             
             for job_data in jobs_data:
                 title = job_data.get('title', '')
@@ -153,32 +213,29 @@ def fetch_and_store_jobs(job_id: str):
                     logger.info(f"Filtered out non-engineering job: {title}")
                     continue
                 
-                try:
-                    job = Job(
-                        title=title,
-                        company=job_data.get('company'),
-                        location=job_data.get('location'),
-                        description=job_data.get('description'),
-                        requirements=job_data.get('requirements'),
-                        salary_min=job_data.get('salary_min'),
-                        salary_max=job_data.get('salary_max'),
-                        salary_currency=job_data.get('salary_currency', 'INR'),
-                        employment_type=job_data.get('employment_type'),
-                        skills_required=job_data.get('skills_required', []),
-                        source=job_data.get('source'),
-                        source_url=job_data.get('source_url'),
-                        apply_url=job_data.get('apply_url'),
-                        posted_date=job_data.get('posted_date'),
-                        scraped_at=datetime.utcnow(),
-                        is_active=True
-                    )
-                    
-                    db.add(job)
-                    stored_count += 1
-                except Exception as e:
-                    logger.error(f"Error storing job: {str(e)}")
-                    continue
+                rows.append({
+                    'title': title,
+                    'company': job_data.get('company'),
+                    'location': job_data.get('location'),
+                    'description': job_data.get('description'),
+                    'requirements': job_data.get('requirements'),
+                    'salary_min': job_data.get('salary_min'),
+                    'salary_max': job_data.get('salary_max'),
+                    'salary_currency': job_data.get('salary_currency', 'INR'),
+                    'employment_type': job_data.get('employment_type'),
+                    'skills_required': job_data.get('skills_required', []),
+                    'source': job_data.get('source'),
+                    'source_url': job_data.get('source_url'),
+                    'apply_url': job_data.get('apply_url'),
+                    'posted_date': job_data.get('posted_date'),
+                    'scraped_at': scraped_at,
+                    'is_active': True,
+                })
             
+            # Batched executemany instead of an ORM object per job
+            for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+                db.execute(insert(Job), rows[start:start + BULK_INSERT_BATCH_SIZE])
+            stored_count = len(rows)
             db.commit()
             db.close()
             
@@ -193,7 +250,7 @@ def fetch_and_store_jobs(job_id: str):
         return {"status": "error", "message": str(e)}
 
 
-@shared_task(name='app.tasks.scraping_tasks.scrape_and_store_all_jobs')
+@shared_task(name='app.tasks.scraping_tasks.scrape_and_store_all_jobs', ignore_result=True)
 def scrape_and_store_all_jobs(keywords: List[str] = None, location: str = "India"):
     """
     Daily automated task: Fetch jobs from all free APIs and store engineering jobs in database.
@@ -220,72 +277,50 @@ def scrape_and_store_all_jobs(keywords: List[str] = None, location: str = "India
     
     logger.info(f"Fetched {total_fetched} jobs from all portals")
     
-    # Store jobs in database with deduplication
+    # Build rows, then deduplicate and insert them as one batch
+    rows = []
+    scraped_at = datetime.utcnow()
     for job_data in all_jobs:
         title = job_data.get('title', '')
-        
-        # Check for duplicates by URL or title+company combo
         redirect_url = job_data.get('redirect_url', '')
-        company = job_data.get('company', '')
-        
-        existing = db.query(Job).filter(
-            (Job.source_url == redirect_url) | 
-            ((Job.title == title) & (Job.company == company))
-        ).first()
         
-        if existing:
-            total_duplicates += 1
-            continue
+        # Parse posted date
+        posted_date_str = job_data.get('posted_date', '')
+        posted_date = None
+        if posted_date_str:
+            try:
+                posted_date = datetime.strptime(posted_date_str[:10], '%Y-%m-%d')
+            except:
+                pass
         
-        try:
-            # Parse posted date
-            posted_date_str = job_data.get('posted_date', '')
-            posted_date = None
-            if posted_date_str:
-                try:
-                    posted_date = datetime.strptime(posted_date_str[:10], '%Y-%m-%d')
-                except:
-                    pass
-            
-            job = Job(
-                title=title,
-                company=company,
-                location=job_data.get('location', location),
-                description=job_data.get('description', ''),
-                requirements=None,
-                salary_min=job_data.get('salary_min'),
-                salary_max=job_data.get('salary_max'),
-                salary_currency='INR',
-                employment_type=job_data.get('job_type'),
-                skills_required=job_data.get('skills', []),
-                source=job_data.get('portal', 'api'),
-                source_url=redirect_url,
-                apply_url=redirect_url,
-                posted_date=posted_date,
-                scraped_at=datetime.utcnow(),
-                is_active=True
-            )
-            
-            db.add(job)
-            db.flush()  # Flush to DB immediately
-            total_stored += 1
-            
-            # Commit every 10 jobs
-            if total_stored % 10 == 0:
-                db.commit()
-                logger.info(f"Committed {total_stored} jobs so far")
-        except Exception as e:
-            logger.error(f"Error storing job '{title}': {str(e)}")
-            db.rollback()  # Rollback failed job only
-            continue
+        rows.append({
+            'title': title,
+            'company': job_data.get('company', ''),
+            'location': job_data.get('location', location),
+            'description': job_data.get('description', ''),
+            'requirements': None,
+            'salary_min': job_data.get('salary_min'),
+            'salary_max': job_data.get('salary_max'),
+            'salary_currency': 'INR',
+            'employment_type': job_data.get('job_type'),
+            'skills_required': job_data.get('skills', []),
+            'source': job_data.get('portal', 'api'),
+            'source_url': redirect_url,
+            'apply_url': redirect_url,
+            'posted_date': posted_date,
+            'scraped_at': scraped_at,
+            'is_active': True,
+        })
     
-    # Final commit
     try:
+        total_stored = insert_new_jobs(db, rows)
+        total_duplicates = len(rows) - total_stored
         db.commit()
         logger.info(f"Final commit: {total_stored} jobs stored successfully")
     except Exception as e:
-        logger.error(f"Error in final commit: {str(e)}")
+        logger.error(f"Error storing jobs: {str(e)}")
         db.rollback()
+        total_stored = 0
     finally:
         db.close()
     
@@ -304,7 +339,7 @@ def scrape_and_store_all_jobs(keywords: List[str] = None, location: str = "India
     return result
 
 
-@shared_task(name='app.tasks.scraping_tasks.fetch_all_zyte_completed_jobs')
+@shared_task(name='app.tasks.scraping_tasks.fetch_all_zyte_completed_jobs', ignore_result=True)
 def fetch_all_zyte_completed_jobs():
     """
     Periodic task: Fetch ALL completed spider jobs from Zyte Cloud and store in database.
@@ -335,6 +370,8 @@ def fetch_all_zyte_completed_jobs():
         total_stored = 0
         total_filtered = 0
         processed_jobs = []
+        rows = []
+        scraped_at = datetime.utcnow()
         
         db = SessionLocal()
         
@@ -371,51 +408,38 @@ def fetch_all_zyte_completed_jobs():
                         total_filtered += 1
                         continue
                     
-                    # Deduplication: check by source_url
                     source_url = item.get('source_url', '') or item.get('url', '') or item.get('apply_url', '')
-                    company = item.get('company', '')
-                    
-                    existing = db.query(Job).filter(
-                        (Job.source_url == source_url) | 
-                        ((Job.title == title) & (Job.company == company))
-                    ).first()
-                    
-                    if existing:
-                        continue
-                    
-                    try:
-                        job = Job(
-                            title=title,
-                            company=company,
-                            location=item.get('location', 'India'),
-                            description=item.get('description', '')[:2000] if item.get('description') else '',
-                            requirements=item.get('requirements'),
-                            salary_min=item.get('salary_min'),
-                            salary_max=item.get('salary_max'),
-                            salary_currency=item.get('salary_currency', 'INR'),
-                            employment_type=item.get('employment_type'),
-                            skills_required=item.get('skills_required', []) or [],
-                            source=spider or item.get('source', 'zyte'),
-                            source_url=source_url,
-                            apply_url=item.get('apply_url', source_url),
-                            posted_date=item.get('posted_date'),
-                            scraped_at=datetime.utcnow(),
-                            is_active=True
-                        )
-                        db.add(job)
-                        total_stored += 1
-                    except Exception as e:
-                        logger.error(f"Error storing Zyte job: {str(e)}")
+                    rows.append({
+                        'title': title,
+                        'company': item.get('company', ''),
+                        'location': item.get('location', 'India'),
+                        'description': item.get('description', '')[:2000] if item.get('description') else '',
+                        'requirements': item.get('requirements'),
+                        'salary_min': item.get('salary_min'),
+                        'salary_max': item.get('salary_max'),
+                        'salary_currency': item.get('salary_currency', 'INR'),
+                        'employment_type': item.get('employment_type'),
+                        'skills_required': item.get('skills_required', []) or [],
+                        'source': spider or item.get('source', 'zyte'),
+                        'source_url': source_url,
+                        'apply_url': item.get('apply_url', source_url),
+                        'posted_date': item.get('posted_date'),
+                        'scraped_at': scraped_at,
+                        'is_active': True,
+                    })
                 
                 processed_jobs.append(job_key)
                 
             except Exception as e:
                 logger.error(f"Error fetching items for {job_key}: {str(e)}")
         
+        # Deduplicate against the table and insert everything in one pass
         try:
+            total_stored = insert_new_jobs(db, rows)
             db.commit()
         except Exception as e:
             logger.error(f"Error committing Zyte jobs: {str(e)}")
+            total_stored = 0
             db.rollback()
         finally:
             db.close()
@@ -6,6 +6,9 @@ Focus: SDE, DevOps, QA, Backend, Frontend, Fullstack, Data Engineering
 from celery import Celery
 from celery.schedules import crontab
 from app.core.config import settings
+from app.core.celery_serialization import register_orjson_serializer
+
+register_orjson_serializer()
 
 # Initialize Celery
 celery_app = Celery(
@@ -16,9 +19,12 @@ celery_app = Celery(
 
 # Configuration
 celery_app.conf.update(
-    task_serializer='json',
-    accept_content=['json'],
-    result_serializer='json',
+    task_serializer='orjson',
+    accept_content=['orjson', 'json'],
+    result_serializer='orjson',
+    # Results are never read back; keep them small and short-lived in Redis
+    result_expires=3600,
+    result_extended=False,
     timezone='Asia/Kolkata',
     enable_utc=False,
 )
@@ -38,37 +44,32 @@ ENGINEERING_KEYWORDS = [
     'node.js developer',
 ]
 
+# Shared crontab instances, built once at import
+_CRON_0200 = crontab(hour=2, minute=0)   # 2:00 AM IST
+_CRON_0230 = crontab(hour=2, minute=30)  # 2:30 AM IST
+_CRON_0300 = crontab(hour=3, minute=0)   # 3:00 AM IST
+
 # Schedule for automated scraping (Daily at 2 AM IST)
-celery_app.conf.beat_schedule = {
+# (entry name, task, schedule, keywords, job_count)
+SCRAPE_SCHEDULE = (
     # LinkedIn: 10 jobs/day (5 credits each = 50 credits/day)
-    'scrape-linkedin-engineering-jobs': {
-        'task': 'app.tasks.scraping_tasks.scrape_linkedin_jobs',
-        'schedule': crontab(hour=2, minute=0),  # 2:00 AM IST
-        'kwargs': {
-            'keywords': ENGINEERING_KEYWORDS[:2],  # 2 keywords
-            'job_count': 10
-        }
-    },
-    
+    ('scrape-linkedin-engineering-jobs', 'app.tasks.scraping_tasks.scrape_linkedin_jobs',
+     _CRON_0200, ENGINEERING_KEYWORDS[:2], 10),
     # Indeed: 50 jobs/day (1 credit each = 50 credits/day)
-    'scrape-indeed-engineering-jobs': {
-        'task': 'app.tasks.scraping_tasks.scrape_indeed_jobs',
-        'schedule': crontab(hour=2, minute=30),  # 2:30 AM IST
-        'kwargs': {
-            'keywords': ENGINEERING_KEYWORDS[2:7],  # 5 keywords
-            'job_count': 50
-        }
-    },
-    
+    ('scrape-indeed-engineering-jobs', 'app.tasks.scraping_tasks.scrape_indeed_jobs',
+     _CRON_0230, ENGINEERING_KEYWORDS[2:7], 50),
     # Naukri: 10 jobs/day (1 credit each = 10 credits/day)
-    'scrape-naukri-engineering-jobs': {
-        'task': 'app.tasks.scraping_tasks.scrape_naukri_jobs',
-        'schedule': crontab(hour=3, minute=0),  # 3:00 AM IST
-        'kwargs': {
-            'keywords': ENGINEERING_KEYWORDS[7:9],  # 2 keywords
-            'job_count': 10
-        }
+    ('scrape-naukri-engineering-jobs', 'app.tasks.scraping_tasks.scrape_naukri_jobs',
+     _CRON_0300, ENGINEERING_KEYWORDS[7:9], 10),
+)
+
+celery_app.conf.beat_schedule = {
+    name: {
+        'task': task,
+        'schedule': schedule,
+        'kwargs': {'keywords': keywords, 'job_count': job_count},
     }
+    for name, task, schedule, keywords, job_count in SCRAPE_SCHEDULE
 }
 
 # Total: 70 jobs/day × 14 days = 980 jobs (110 credits/day × 14 = 1540 credits)
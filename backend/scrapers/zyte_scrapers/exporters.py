@@ -0,0 +1,42 @@
+"""
+Feed exporters for scraped job listings
+"""
+
+from decimal import Decimal
+
+import orjson
+from scrapy.exporters import BaseItemExporter
+
+
+def _orjson_default(obj):
+    """Encode the types ScrapyJSONEncoder handled that orjson rejects"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Public since Scrapy 2.13; earlier releases (requirements allow 2.11) only
+# have the underscored name
+_get_serialized_fields = getattr(
+    BaseItemExporter, "get_serialized_fields", None
+) or BaseItemExporter._get_serialized_fields
+
+
+class OrjsonLinesExporter(BaseItemExporter):
+    """
+    JSON Lines feed exporter backed by orjson
+
+    orjson encodes straight to UTF-8 bytes in native code, so items skip the
+    stdlib encoder and the str -> bytes round trip of JsonLinesItemExporter.
+    """
+
+    def __init__(self, file, **kwargs):
+        super().__init__(**kwargs)
+        self.file = file
+
+    def export_item(self, item):
+        # Honours FEED_EXPORT_FIELDS / fields_to_export and field serializers
+        itemdict = dict(_get_serialized_fields(self, item))
+        self.file.write(orjson.dumps(itemdict, default=_orjson_default, option=orjson.OPT_APPEND_NEWLINE))
@@ -1,67 +1,78 @@
 """
-Scrapy Item definitions for ApplyX job listings
+Item definitions for ApplyX job listings
 """
 
-import scrapy
-from datetime import datetime
+from typing import List, Optional
 
+import attr
 
-class JobItem(scrapy.Item):
-    """Job listing item with all relevant fields"""
+
+@attr.s(slots=True, auto_attribs=True, repr=False)
+class JobItem:
+    """
+    Job listing item with all relevant fields
+
+    A slotted attrs class rather than scrapy.Item: ItemAdapter supports it
+    natively, and attribute access skips scrapy.Item's per-assignment field
+    validation and backing dict.
+    """
     
     # Unique identifier
-    job_id = scrapy.Field()
+    job_id: Optional[str] = None
     
     # Basic info
-    title = scrapy.Field()
-    company = scrapy.Field()
-    location = scrapy.Field()
+    title: str = ''
+    company: str = ''
+    location: str = ''
     
     # Job details
-    description = scrapy.Field()
-    requirements = scrapy.Field()
-    responsibilities = scrapy.Field()
+    description: str = ''
+    requirements: str = ''
+    responsibilities: str = ''
     
     # Compensation & benefits
-    salary_min = scrapy.Field()
-    salary_max = scrapy.Field()
-    salary_currency = scrapy.Field()
-    benefits = scrapy.Field()
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
+    benefits: Optional[str] = None
     
     # Employment details
-    employment_type = scrapy.Field()  # full-time, part-time, contract, internship
-    experience_min = scrapy.Field()   # years
-    experience_max = scrapy.Field()   # years
-    experience_level = scrapy.Field()  # entry, mid, senior, executive
+    employment_type: Optional[str] = None  # full-time, part-time, contract, internship
+    experience_min: Optional[int] = None   # years
+    experience_max: Optional[int] = None   # years
+    experience_level: Optional[str] = None  # entry, mid, senior, executive
     
     # Skills & qualifications
-    skills_required = scrapy.Field()  # list
-    skills_preferred = scrapy.Field()  # list
-    education_required = scrapy.Field()
-    certifications = scrapy.Field()  # list
+    skills_required: List[str] = attr.Factory(list)
+    skills_preferred: List[str] = attr.Factory(list)
+    education_required: Optional[str] = None
+    certifications: List[str] = attr.Factory(list)
     
     # Application details
-    apply_url = scrapy.Field()
-    apply_email = scrapy.Field()
-    application_deadline = scrapy.Field()
+    apply_url: Optional[str] = None
+    apply_email: Optional[str] = None
+    application_deadline: Optional[str] = None
     
     # Meta information
-    source = scrapy.Field()  # linkedin, indeed, naukri, etc.
-    source_url = scrapy.Field()
-    posted_date = scrapy.Field()
-    scraped_at = scrapy.Field()
+    source: Optional[str] = None  # linkedin, indeed, naukri, etc.
+    source_url: Optional[str] = None
+    posted_date: Optional[str] = None
+    scraped_at: Optional[str] = None
     
     # Company details
-    company_size = scrapy.Field()
-    company_industry = scrapy.Field()
-    company_website = scrapy.Field()
-    company_rating = scrapy.Field()
+    company_size: Optional[str] = None
+    company_industry: Optional[str] = None
+    company_website: Optional[str] = None
+    company_rating: Optional[str] = None
     
     # Additional
-    is_remote = scrapy.Field()  # bool
-    work_from_home = scrapy.Field()  # bool
-    relocation_assistance = scrapy.Field()  # bool
-    visa_sponsorship = scrapy.Field()  # bool
+    is_remote: Optional[bool] = None
+    work_from_home: Optional[bool] = None
+    relocation_assistance: Optional[bool] = None
+    visa_sponsorship: Optional[bool] = None
+    
+    # Internal: lowercased description passed between pipelines, removed before export
+    _desc_lower: Optional[str] = None
     
     def __repr__(self):
-        return f"JobItem(title='{self.get('title')}', company='{self.get('company')}')"
+        return f"JobItem(title='{self.title}', company='{self.company}')"
@@ -18,6 +18,14 @@ class ScrapingBeeMiddleware:
             raise NotConfigured('SCRAPINGBEE_API_KEY not set')
         self.api_key = api_key
         self.api_url = 'https://app.scrapingbee.com/api/v1/'
+        # Constant part of the query string, encoded once; only url= varies
+        self.base_qs = urllib.parse.urlencode({
+            'api_key': api_key,
+            'render_js': 'true',  # Enable JavaScript rendering for LinkedIn
+            'premium_proxy': 'true',  # Use premium proxies for better success rate
+            'country_code': 'in',  # Use India IP addresses
+        })
+        self.base_url = f"{self.api_url}?{self.base_qs}"
     
     @classmethod
     def from_crawler(cls, crawler):
@@ -33,28 +41,26 @@ class ScrapingBeeMiddleware:
         """
         Proxy the request through ScrapingBee
         """
-        # Skip if already a ScrapingBee URL
-        if 'scrapingbee.com' in request.url:
+        # Skip requests this middleware already rewrote (including their retries)
+        if request.meta.get('_sb_wrapped'):
             return None
         
-        # Build ScrapingBee URL
-        params = {
-            'api_key': self.api_key,
-            'url': request.url,
-            'render_js': 'true',  # Enable JavaScript rendering for LinkedIn
-            'premium_proxy': 'true',  # Use premium proxies for better success rate
-            'country_code': 'in',  # Use India IP addresses
-        }
-        
-        # Construct the ScrapingBee request URL
-        scrapingbee_url = f"{self.api_url}?{urllib.parse.urlencode(params)}"
+        # Construct the ScrapingBee request URL; only the target url needs encoding
+        scrapingbee_url = (
+            f"{self.base_url}&url={urllib.parse.quote_plus(request.url, safe='')}"
+        )
         
         # Replace the original request URL with ScrapingBee URL
         request = request.replace(
             url=scrapingbee_url,
             method='GET',
-            dont_filter=True
+            dont_filter=True,
+            # Pool by spider rather than the rewritten proxy hostname
+            meta={**request.meta, '_sb_wrapped': True, 'download_slot': spider.name},
         )
+        # Every request targets the same proxy host; ask it to keep the
+        # pooled connection open instead of paying a TLS handshake per request
+        request.headers['Connection'] = 'keep-alive'
         
         return request
     
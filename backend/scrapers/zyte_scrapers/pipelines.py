@@ -2,51 +2,131 @@
 Data processing pipelines for scraped job listings
 """
 
-import json
 import re
-import hashlib
 from datetime import datetime
+import ahocorasick
+import orjson
+import redis
+import xxhash
 from itemadapter import ItemAdapter
+from scrapy.exceptions import DropItem
+from twisted.internet.threads import deferToThread
+
+
+# Compiled once at import; these run against every scraped item
+_CLEAN_RE = re.compile(r'[^\w\s.,!?()-]')
+# Anything the cleaning step would change: a character _CLEAN_RE drops or
+# whitespace other than single inner spaces
+_DIRTY_RE = re.compile(r'[^\w .,!?()-]|\s\s|^\s|\s$')
+_SALARY_RE = re.compile(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)')
+
+# Experience level keywords matched against lowercased titles, as whole words
+_SENIOR_RE = re.compile(r'\b(?:senior|lead|principal|staff)\b')
+_ENTRY_RE = re.compile(r'\b(?:junior|entry|fresher|graduate)\b')
+_INTERN_RE = re.compile(r'\bintern(?:ship)?s?\b')
 
 
 class DeduplicationPipeline:
-    """Remove duplicate jobs based on title + company"""
+    """
+    Remove duplicate jobs based on title + company
+
+    When DEDUP_REDIS_URL is set, seen hashes are also recorded in a Redis set
+    so parallel workers and later runs of the same spider skip known jobs.
+    """
     
-    def __init__(self):
+    __slots__ = ('seen_jobs', 'redis', 'ttl_seconds', 'redis_key')
+    
+    def __init__(self, redis_url='', ttl_days=14):
         self.seen_jobs = set()
+        self.redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self.ttl_seconds = ttl_days * 86400
+        self.redis_key = None
+    
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            redis_url=crawler.settings.get('DEDUP_REDIS_URL'),
+            ttl_days=crawler.settings.getint('DEDUP_TTL_DAYS', 14),
+        )
+    
+    def open_spider(self, spider):
+        if self.redis is not None:
+            self.redis_key = f'applyx:seen:{spider.name}'
+    
+    def close_spider(self, spider):
+        if self.redis is not None:
+            # Refresh the TTL so the shared set outlives the scraping schedule window
+            self.redis.expire(self.redis_key, self.ttl_seconds)
     
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         
-        # Create hash from title + company
+        # Non-cryptographic 64-bit hash of title + company; ints keep the set small
         title = adapter.get('title', '').lower().strip()
         company = adapter.get('company', '').lower().strip()
-        job_hash = hashlib.md5(f"{title}{company}".encode()).hexdigest()
+        # Feed the parts straight into the hasher; the NUL separator keeps
+        # ("ab", "c") and ("a", "bc") apart without building a joined key
+        hasher = xxhash.xxh3_64(title.encode())
+        hasher.update(b'\x00')
+        hasher.update(company.encode())
+        job_hash = hasher.intdigest()
         
+        # Local set answers repeats within this run without a round trip
         if job_hash in self.seen_jobs:
             spider.logger.info(f"Duplicate job found: {title} at {company}")
-            from scrapy.exceptions import DropItem
             raise DropItem(f"Duplicate: {title}")
         
         self.seen_jobs.add(job_hash)
-        adapter['job_id'] = job_hash
+        adapter['job_id'] = f"{job_hash:016x}"
+        if self.redis is None:
+            return item
+        
+        # The blocking SADD runs in the reactor's thread pool so the round
+        # trip doesn't stall in-flight downloads; Scrapy waits on the Deferred
+        d = deferToThread(self._add_shared, job_hash)
+        d.addCallback(self._check_shared, item, title, company, spider)
+        return d
+    
+    def _add_shared(self, job_hash):
+        # EXPIRE NX gives a new set its TTL in the same round trip, so a
+        # crawl that dies before close_spider doesn't leave a key that
+        # never expires and suppresses those jobs for good
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.sadd(self.redis_key, job_hash)
+        pipe.expire(self.redis_key, self.ttl_seconds, nx=True)
+        return pipe.execute()[0]
+    
+    def _check_shared(self, added, item, title, company, spider):
+        # SADD returns 0 when another worker or earlier run already saw the job
+        if not added:
+            spider.logger.info(f"Duplicate job found: {title} at {company}")
+            raise DropItem(f"Duplicate: {title}")
         return item
 
 
 class DataCleaningPipeline:
     """Clean and normalize job data"""
     
+    __slots__ = ('scraped_at',)
+    
+    def open_spider(self, spider):
+        # One timestamp per crawl; per-item precision isn't meaningful here
+        self.scraped_at = datetime.utcnow().isoformat()
+    
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         
         # Clean text fields
         text_fields = ['title', 'company', 'location', 'description', 'requirements']
         for field in text_fields:
-            if adapter.get(field):
+            value = adapter.get(field)
+            # Already-clean values (the common case for title/company/location)
+            # would come back unchanged, so skip rebuilding them
+            if value and _DIRTY_RE.search(value):
                 # Remove excess whitespace
-                cleaned = ' '.join(adapter[field].split())
+                cleaned = ' '.join(value.split())
                 # Remove special characters but keep basic punctuation
-                cleaned = re.sub(r'[^\w\s.,!?()-]', '', cleaned)
+                cleaned = _CLEAN_RE.sub('', cleaned)
                 adapter[field] = cleaned.strip()
         
         # Normalize location
@@ -56,21 +136,26 @@ class DataCleaningPipeline:
             if ',' in location:
                 adapter['location'] = location.split(',')[0].strip()
         
+        # Lowercase the cleaned description once; reused below and handed to
+        # SkillExtractionPipeline through the internal _desc_lower field
+        desc_lower = (adapter.get('description') or '').lower()
+        adapter['_desc_lower'] = desc_lower
+        
         # Parse salary if present in description
-        if not adapter.get('salary_min') and adapter.get('description'):
-            salary_match = re.search(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)', adapter['description'])
+        if not adapter.get('salary_min') and desc_lower:
+            salary_match = _SALARY_RE.search(desc_lower)
             if salary_match:
                 adapter['salary_min'] = int(salary_match.group(1).replace(',', ''))
                 adapter['salary_max'] = int(salary_match.group(2).replace(',', ''))
                 adapter['salary_currency'] = 'INR'
         
         # Detect remote/WFH
-        desc_lower = adapter.get('description', '').lower()
-        adapter['is_remote'] = 'remote' in desc_lower or 'work from home' in desc_lower
-        adapter['work_from_home'] = 'wfh' in desc_lower or 'work from home' in desc_lower
+        wfh = 'work from home' in desc_lower
+        adapter['is_remote'] = wfh or 'remote' in desc_lower
+        adapter['work_from_home'] = wfh or 'wfh' in desc_lower
         
         # Set scraped timestamp
-        adapter['scraped_at'] = datetime.utcnow().isoformat()
+        adapter['scraped_at'] = self.scraped_at
         
         return item
 
@@ -79,7 +164,7 @@ class SkillExtractionPipeline:
     """Extract skills from job description"""
     
     # Common tech skills
-    TECH_SKILLS = {
+    TECH_SKILLS = frozenset({
         'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust',
         'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'spring', 'laravel',
         'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'redis', 'elasticsearch',
@@ -87,33 +172,57 @@ class SkillExtractionPipeline:
         'git', 'github', 'gitlab', 'ci/cd', 'agile', 'scrum', 'jira',
         'machine learning', 'deep learning', 'tensorflow', 'pytorch', 'nlp',
         'html', 'css', 'sass', 'webpack', 'babel', 'rest api', 'graphql',
-    }
+    })
+    
+    __slots__ = ('automaton',)
+    
+    def __init__(self):
+        # One automaton over every skill: a single linear pass per text,
+        # independent of how large TECH_SKILLS grows
+        self.automaton = ahocorasick.Automaton()
+        for skill in self.TECH_SKILLS:
+            self.automaton.add_word(skill, skill)
+        self.automaton.make_automaton()
+    
+    def _match_skills(self, text, found_skills):
+        """Add skills occurring as whole words in text to found_skills"""
+        text_len = len(text)
+        for end, skill in self.automaton.iter(text):
+            start = end - len(skill) + 1
+            # Reject hits inside a longer word ("go" in "good")
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end + 1 < text_len and text[end + 1].isalnum():
+                continue
+            found_skills.add(skill)
     
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         
-        # Combine description and requirements for skill extraction
-        text = ' '.join(filter(None, [
-            adapter.get('description', ''),
-            adapter.get('requirements', '')
-        ])).lower()
+        # Reuse the lowercased description from DataCleaningPipeline and drop
+        # the internal field so it never reaches the exported item
+        desc_lower = adapter.pop('_desc_lower', None)
+        if desc_lower is None:
+            desc_lower = (adapter.get('description') or '').lower()
         
-        # Extract skills
+        # Scan description and requirements separately rather than joining them
         found_skills = set()
-        for skill in self.TECH_SKILLS:
-            if skill in text:
-                found_skills.add(skill)
+        if desc_lower:
+            self._match_skills(desc_lower, found_skills)
+        if adapter.get('requirements'):
+            self._match_skills(adapter['requirements'].lower(), found_skills)
         
         if found_skills:
-            adapter['skills_required'] = list(found_skills)
+            # Sorted so the stored list doesn't churn with set iteration order
+            adapter['skills_required'] = sorted(found_skills)
         
         # Infer experience level from title
         title_lower = adapter.get('title', '').lower()
-        if any(word in title_lower for word in ['senior', 'lead', 'principal', 'staff']):
+        if _SENIOR_RE.search(title_lower):
             adapter['experience_level'] = 'senior'
-        elif any(word in title_lower for word in ['junior', 'entry', 'fresher', 'graduate']):
+        elif _ENTRY_RE.search(title_lower):
             adapter['experience_level'] = 'entry'
-        elif 'intern' in title_lower:
+        elif _INTERN_RE.search(title_lower):
             adapter['experience_level'] = 'internship'
         else:
             adapter['experience_level'] = 'mid'
@@ -122,23 +231,18 @@ class SkillExtractionPipeline:
 
 
 class JsonExportPipeline:
-    """Export items to JSON file (for local testing)"""
+    """Export items as JSON Lines (for local testing)"""
+    
+    __slots__ = ('file',)
     
     def open_spider(self, spider):
-        self.file = open(f'{spider.name}_output.json', 'w', encoding='utf-8')
-        self.file.write('[\n')
-        self.first_item = True
+        # Binary mode with a large buffer: orjson already emits UTF-8 bytes
+        self.file = open(f'{spider.name}_output.jsonl', 'wb', buffering=1 << 20)
     
     def close_spider(self, spider):
-        self.file.write('\n]')
         self.file.close()
     
     def process_item(self, item, spider):
-        if not self.first_item:
-            self.file.write(',\n')
-        else:
-            self.first_item = False
-        
-        line = json.dumps(dict(item), indent=2, ensure_ascii=False)
-        self.file.write(line)
+        # One write per item; the 1 MiB buffer batches these into large syscalls
+        self.file.write(orjson.dumps(ItemAdapter(item).asdict(), option=orjson.OPT_APPEND_NEWLINE))
         return item
@@ -17,7 +17,11 @@ ROBOTSTXT_OBEY = False  # ScrapingBee handles this
 
 # Configure concurrent requests (be conservative with free tier)
 CONCURRENT_REQUESTS = 8
-CONCURRENT_REQUESTS_PER_DOMAIN = 4
+# Every request is rewritten to app.scrapingbee.com, so the per-domain cap is
+# effectively the global cap; it also sizes the persistent connection pool.
+# Spiders that raise CONCURRENT_REQUESTS must raise this too, and drop
+# DOWNLOAD_DELAY so AutoThrottle rather than a fixed delay paces the slot.
+CONCURRENT_REQUESTS_PER_DOMAIN = CONCURRENT_REQUESTS
 
 # Download delay
 DOWNLOAD_DELAY = 1
@@ -57,6 +61,10 @@ ITEM_PIPELINES = {
     'zyte_scrapers.pipelines.JsonExportPipeline': 400,
 }
 
+# Shared dedup state across workers/runs (leave unset for in-process dedup only)
+DEDUP_REDIS_URL = os.getenv('DEDUP_REDIS_URL', '')
+DEDUP_TTL_DAYS = 14
+
 # Enable and configure HTTP caching (disabled for cloud)
 HTTPCACHE_ENABLED = False
 
@@ -65,6 +73,12 @@ REQUEST_FINGERPRINTER_IMPLEMENTATION = '2.7'
 TWISTED_REACTOR = 'twisted.internet.asyncioreactor.AsyncioSelectorReactor'
 FEED_EXPORT_ENCODING = 'utf-8'
 
+# JSON Lines feeds (-o jobs.jsonl) are encoded with orjson
+FEED_EXPORTERS = {
+    'jsonlines': 'zyte_scrapers.exporters.OrjsonLinesExporter',
+    'jsonl': 'zyte_scrapers.exporters.OrjsonLinesExporter',
+}
+
 # ==================================================
 # LOGGING
 # ==================================================
@@ -77,4 +91,5 @@ LOG_FORMAT = '%(asctime)s [%(name)s] %(levelname)s: %(message)s'
 AUTOTHROTTLE_ENABLED = True
 AUTOTHROTTLE_START_DELAY = 1
 AUTOTHROTTLE_MAX_DELAY = 10
-AUTOTHROTTLE_TARGET_CONCURRENCY = 2.0
+# Per-slot target; spiders raise CONCURRENT_REQUESTS_PER_DOMAIN well above this
+AUTOTHROTTLE_TARGET_CONCURRENCY = 10.0
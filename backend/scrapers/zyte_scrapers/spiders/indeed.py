@@ -2,10 +2,17 @@
 Indeed India Jobs Spider using Zyte API
 """
 
+import re
+import sys
 import scrapy
 from urllib.parse import urlencode, quote_plus
 from zyte_scrapers.items import JobItem
-from datetime import datetime
+
+
+# Matches "₹3,00,000 - ₹6,00,000 a year"
+_SALARY_RANGE_RE = re.compile(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)')
+# Matches a single figure like "₹5,00,000"
+_SALARY_SINGLE_RE = re.compile(r'₹\s*(\d+(?:,\d+)*)')
 
 
 class IndeedSpider(scrapy.Spider):
@@ -14,6 +21,8 @@ class IndeedSpider(scrapy.Spider):
     
     custom_settings = {
         'CONCURRENT_REQUESTS': 80,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 80,
+        'DOWNLOAD_DELAY': 0,
         'ZYTE_API_DEFAULT_PARAMS': {
             'browserHtml': True,
             'geolocation': 'IN',
@@ -57,44 +66,40 @@ class IndeedSpider(scrapy.Spider):
         """Parse job details"""
         job = JobItem()
         
-        job['title'] = response.css('h1.jobsearch-JobInfoHeader-title span::text').get('').strip()
-        job['company'] = response.css('div[data-company-name="true"] a::text').get('').strip()
-        job['location'] = response.css('div[data-testid="inlineHeader-companyLocation"] div::text').get('').strip()
+        job.title = response.css('h1.jobsearch-JobInfoHeader-title span::text').get('').strip()
+        job.company = response.css('div[data-company-name="true"] a::text').get('').strip()
+        job.location = response.css('div[data-testid="inlineHeader-companyLocation"] div::text').get('').strip()
         
-        # Description from rich text div
-        desc_div = response.css('div#jobDescriptionText')
-        job['description'] = ' '.join(desc_div.css('::text').getall()).strip()
+        # Description from rich text div; string(.) concatenates its text in libxml2
+        job.description = response.css('div#jobDescriptionText').xpath('string(.)').get('').strip()
         
         # Salary if present
         salary = response.css('div#salaryInfoAndJobType span::text').get()
         if salary:
-            job['salary_min'], job['salary_max'] = self._parse_salary(salary)
-            job['salary_currency'] = 'INR'
+            job.salary_min, job.salary_max = self._parse_salary(salary)
+            job.salary_currency = 'INR'
         
         # Job type
         job_type = response.css('div#salaryInfoAndJobType div::text').getall()
         for jt in job_type:
             if any(x in jt.lower() for x in ['full', 'part', 'contract', 'temporary']):
-                job['employment_type'] = jt.strip().lower()
+                # Few distinct values across many items; share one string each
+                job.employment_type = sys.intern(jt.strip().lower())
                 break
         
         # Meta
-        job['source'] = 'indeed'
-        job['source_url'] = response.url
-        job['apply_url'] = response.url
-        job['scraped_at'] = datetime.utcnow().isoformat()
+        job.source = 'indeed'
+        job.source_url = response.url
+        job.apply_url = response.url
         
         yield job
     
     def _parse_salary(self, salary_text):
         """Parse salary from Indeed format"""
-        import re
-        # Match patterns like "₹3,00,000 - ₹6,00,000 a year"
-        match = re.search(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)', salary_text)
+        match = _SALARY_RANGE_RE.search(salary_text)
         if match:
             return int(match.group(1).replace(',', '')), int(match.group(2).replace(',', ''))
-        # Single salary "₹5,00,000"
-        match = re.search(r'₹\s*(\d+(?:,\d+)*)', salary_text)
+        match = _SALARY_SINGLE_RE.search(salary_text)
         if match:
             sal = int(match.group(1).replace(',', ''))
             return sal, sal
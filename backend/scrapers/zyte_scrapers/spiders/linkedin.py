@@ -3,10 +3,24 @@ LinkedIn Jobs Spider using Zyte API
 Scrapes job listings from LinkedIn India
 """
 
+import re
 import scrapy
+from functools import lru_cache
 from urllib.parse import urlencode
 from zyte_scrapers.items import JobItem
-from datetime import datetime
+
+
+# Matches patterns like "₹5,00,000 - ₹8,00,000"
+_SALARY_RANGE_RE = re.compile(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)')
+
+
+@lru_cache(maxsize=None)
+def _section_re(section_name):
+    """Compiled pattern for a description section (few distinct names per crawl)"""
+    return re.compile(
+        f'{section_name}:?(.*?)(?:responsibilities|qualifications|benefits|$)',
+        re.DOTALL,
+    )
 
 
 class LinkedInSpider(scrapy.Spider):
@@ -20,6 +34,8 @@ class LinkedInSpider(scrapy.Spider):
             'javascript': True,  # LinkedIn is JavaScript-heavy
         },
         'CONCURRENT_REQUESTS': 50,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 50,
+        'DOWNLOAD_DELAY': 0,
     }
     
     def __init__(self, keywords='software engineer', location='India', *args, **kwargs):
@@ -69,52 +85,43 @@ class LinkedInSpider(scrapy.Spider):
         job = JobItem()
         
         # Basic info
-        job['title'] = response.css('h1.top-card-layout__title::text').get('').strip()
-        job['company'] = response.css('a.topcard__org-name-link::text').get('').strip()
-        job['location'] = response.css('span.topcard__flavor--bullet::text').get('').strip()
+        job.title = response.css('h1.top-card-layout__title::text').get('').strip()
+        job.company = response.css('a.topcard__org-name-link::text').get('').strip()
+        job.location = response.css('span.topcard__flavor--bullet::text').get('').strip()
         
-        # Job description
-        description = response.css('div.description__text').get('')
-        job['description'] = self._clean_html(description)
+        # Job description as tag-free text in a single libxml2 pass
+        description = response.css('div.description__text').xpath('string(.)').get('')
+        job.description = description.strip()
         
         # Extract requirements from description
         if 'requirements' in description.lower():
-            job['requirements'] = self._extract_section(description, 'requirements')
+            job.requirements = self._extract_section(description, 'requirements')
         
         # Employment type
         job_type = response.css('span.description__job-criteria-text::text').get('')
-        job['employment_type'] = self._normalize_job_type(job_type)
+        job.employment_type = self._normalize_job_type(job_type)
         
         # Salary (if available)
         salary_text = response.css('div.salary::text').get('')
         if salary_text:
-            job['salary_min'], job['salary_max'] = self._parse_salary(salary_text)
-            job['salary_currency'] = 'INR'
+            job.salary_min, job.salary_max = self._parse_salary(salary_text)
+            job.salary_currency = 'INR'
         
         # Meta
-        job['source'] = 'linkedin'
-        job['source_url'] = response.url
-        job['apply_url'] = response.css('a.apply-button::attr(href)').get() or response.url
-        job['posted_date'] = self._extract_posted_date(response)
-        job['scraped_at'] = datetime.utcnow().isoformat()
+        job.source = 'linkedin'
+        job.source_url = response.url
+        job.apply_url = response.css('a.apply-button::attr(href)').get() or response.url
+        job.posted_date = self._extract_posted_date(response)
         
         # Company details (if available)
-        job['company_size'] = response.css('li.company-size::text').get('')
-        job['company_industry'] = response.css('li.company-industry::text').get('')
+        job.company_size = response.css('li.company-size::text').get('')
+        job.company_industry = response.css('li.company-industry::text').get('')
         
         yield job
     
-    def _clean_html(self, html_text):
-        """Remove HTML tags and clean text"""
-        import re
-        text = re.sub('<[^<]+?>', '', html_text)
-        return ' '.join(text.split()).strip()
-    
     def _extract_section(self, text, section_name):
         """Extract specific section from job description"""
-        import re
-        pattern = f'{section_name}:?(.*?)(?:responsibilities|qualifications|benefits|$)'
-        match = re.search(pattern, text.lower(), re.DOTALL)
+        match = _section_re(section_name).search(text.lower())
         return match.group(1).strip() if match else ''
     
     def _normalize_job_type(self, job_type_text):
@@ -132,9 +139,7 @@ class LinkedInSpider(scrapy.Spider):
     
     def _parse_salary(self, salary_text):
         """Parse salary range from text"""
-        import re
-        # Match patterns like "₹5,00,000 - ₹8,00,000"
-        match = re.search(r'₹\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)', salary_text)
+        match = _SALARY_RANGE_RE.search(salary_text)
         if match:
             min_sal = int(match.group(1).replace(',', ''))
             max_sal = int(match.group(2).replace(',', ''))
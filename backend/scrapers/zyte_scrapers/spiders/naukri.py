@@ -3,10 +3,77 @@ Naukri.com Jobs Spider using Zyte API
 India's largest job portal
 """
 
+import re
+import sys
+import orjson
 import scrapy
+from lxml import etree
+from parsel.csstranslator import css2xpath
 from urllib.parse import quote_plus
 from zyte_scrapers.items import JobItem
-from datetime import datetime
+
+
+# Experience like "3-5 Yrs" or "2 Yrs"
+_EXP_RANGE_RE = re.compile(r'(\d+)\s*-\s*(\d+)')
+_EXP_SINGLE_RE = re.compile(r'(\d+)')
+# Salary like "5-8 Lacs PA" or "3,00,000 - 6,00,000 PA"
+_LACS_RE = re.compile(r'(\d+)\s*-\s*(\d+)\s*lacs?', re.I)
+_RUPEE_RE = re.compile(r'₹?\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)')
+_NOT_DISCLOSED_RE = re.compile(r'not\s*disclosed', re.I)
+# Employment type keywords ('intern' also covers 'internship')
+_INTERN_RE = re.compile(r'intern', re.I)
+_FULL_TIME_RE = re.compile(r'full[- ]time', re.I)
+_COMPANY_SIZE_RE = re.compile(r'(\d+\+?\s*(?:employees)?)')
+# Job id at the end of a listing URL: /job-listings-<slug>-120924500123?src=...
+_JOB_ID_RE = re.compile(r'-(\d+)(?:[?#]|$)')
+
+
+def _compile_css(css):
+    """Translate a CSS selector to a compiled lxml XPath once, at import time"""
+    return etree.XPath(css2xpath(css), smart_strings=False)
+
+
+def _first(xpath, root):
+    """Return the first result of a compiled XPath, or None"""
+    result = xpath(root)
+    return result[0] if result else None
+
+
+# Job page selectors, compiled once instead of re-parsed on every response
+_TITLE_XPATH = _compile_css('h1.jd-header-title::text')
+_COMPANY_XPATH = _compile_css('a.pad-rt-8::text')
+_LOCATION_XPATH = _compile_css('span.loc::text')
+_DESC_TEXT_XPATH = _compile_css('div.job-desc ::text')
+_EXP_XPATH = _compile_css('span.exp::text')
+_SALARY_XPATH = _compile_css('span.salary::text')
+_CHIPS_XPATH = _compile_css('a.chip::text')
+_RATING_XPATH = _compile_css('span.rating::text')
+_COMPANY_LINK_XPATH = _compile_css('a[href*="company-"]::text')
+_LD_JSON_XPATH = _compile_css('script[type="application/ld+json"]::text')
+
+
+def _ld_node(value):
+    """Return a JSON-LD value as a single dict (first entry of a list)"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return value if isinstance(value, dict) else {}
+
+
+def _job_posting_ld(root):
+    """Return the page's schema.org JobPosting JSON-LD block, or {}"""
+    for raw in _LD_JSON_XPATH(root):
+        try:
+            data = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            data = data.get('@graph', [data])
+        if not isinstance(data, list):
+            continue
+        for node in data:
+            if isinstance(node, dict) and node.get('@type') == 'JobPosting':
+                return node
+    return {}
 
 
 class NaukriSpider(scrapy.Spider):
@@ -15,29 +82,42 @@ class NaukriSpider(scrapy.Spider):
     
     custom_settings = {
         'CONCURRENT_REQUESTS': 100,  # Naukri can handle high concurrency
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 100,
+        'DOWNLOAD_DELAY': 0,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 50.0,
+        'REACTOR_THREADPOOL_MAXSIZE': 32,  # DNS lookups run in the reactor thread pool
         'ZYTE_API_DEFAULT_PARAMS': {
             'browserHtml': True,
             'geolocation': 'IN',
         },
     }
     
-    def __init__(self, keywords='software engineer', location='india', *args, **kwargs):
+    def __init__(self, keywords='software engineer', location='india', max_pages=50, *args, **kwargs):
         super(NaukriSpider, self).__init__(*args, **kwargs)
         self.keywords = keywords
         self.location = location
-        self.start_urls = [self._build_search_url(keywords, location)]
-    
-    def _build_search_url(self, keywords, location, page=1):
-        """Build Naukri search URL"""
+        self.max_pages = int(max_pages)
         # Naukri URL pattern: https://www.naukri.com/{keywords}-jobs-in-{location}
+        # Keywords and location are fixed for the crawl, so slug and encode them once
         keywords_slug = keywords.replace(' ', '-')
         location_slug = location.replace(' ', '-').lower()
-        return f"https://www.naukri.com/{keywords_slug}-jobs-in-{location_slug}?k={quote_plus(keywords)}&l={quote_plus(location)}&p={page}"
+        self._search_url_prefix = (
+            f"https://www.naukri.com/{keywords_slug}-jobs-in-{location_slug}"
+            f"?k={quote_plus(keywords)}&l={quote_plus(location)}&p="
+        )
+        self.start_urls = [self._build_search_url()]
+        # Job ids already requested; the same posting shows up across pages
+        self._seen_job_ids = set()
+    
+    def _build_search_url(self, page=1):
+        """Build Naukri search URL for a results page"""
+        return f"{self._search_url_prefix}{page}"
     
     def parse(self, response):
         """Parse job listing page"""
         # Naukri job articles
         job_articles = response.css('article.jobTuple')
+        page_job_ids = []
         
         for article in job_articles:
             # Get job title link
@@ -45,98 +125,150 @@ class NaukriSpider(scrapy.Spider):
             job_url = response.urljoin(title_elem) if title_elem else None
             
             if job_url:
+                # Skip postings already requested under another URL (tracking params differ)
+                id_match = _JOB_ID_RE.search(job_url)
+                job_id = id_match.group(1) if id_match else job_url
+                page_job_ids.append(job_id)
+                if job_id in self._seen_job_ids:
+                    continue
+                self._seen_job_ids.add(job_id)
+                
                 # Extract preview data from listing
+                # normalize-space() trims inside lxml, so no .strip() copies here
                 preview_data = {
-                    'title': article.css('a.title::text').get('').strip(),
-                    'company': article.css('a.comp-name::text').get('').strip(),
+                    'title': article.xpath('normalize-space(.//a[has-class("title")])').get(),
+                    'company': article.xpath('normalize-space(.//a[has-class("comp-name")])').get(),
                     'experience': article.css('span.exp::text').get(''),
                     'salary': article.css('span.sal::text').get(''),
-                    'location': article.css('span.loc::text').get('').strip(),
+                    'location': article.xpath('normalize-space(.//span[has-class("loc")])').get(),
                     'tags': article.css('span.tag::text').getall(),
                 }
                 
+                # Detail pages outrank pagination, so a listing page's jobs reach
+                # the downloader as one burst instead of trickling behind page N+1
                 yield scrapy.Request(
                     job_url,
                     callback=self.parse_job,
-                    meta={'preview_data': preview_data}
+                    meta={'preview_data': preview_data},
+                    priority=1,
                 )
         
-        # Pagination
-        next_page = response.css('a.fright::attr(href)').get()
-        if next_page and 'next' in response.css('a.fright::text').get('').lower():
-            yield response.follow(next_page, callback=self.parse)
+        # Pagination: results pages are numbered, so build page N+1 from the
+        # search URL. Stop at an empty page, at max_pages, or when a page
+        # repeats the previous one (Naukri may serve its last page again for
+        # out-of-range page numbers). A page of already-queued postings is not
+        # a stop signal: results shift between fetches
+        page = response.meta.get('page', 1)
+        page_job_ids = tuple(page_job_ids)
+        if page_job_ids and page < self.max_pages and page_job_ids != response.meta.get('page_job_ids'):
+            yield scrapy.Request(
+                self._build_search_url(page + 1),
+                callback=self.parse,
+                meta={'page': page + 1, 'page_job_ids': page_job_ids},
+            )
     
     def parse_job(self, response):
         """Parse individual job page"""
         job = JobItem()
         preview = response.meta.get('preview_data', {})
+        root = response.selector.root
+        
+        # Structured JobPosting data when the page carries it; the selectors
+        # below only fill what it leaves out
+        posting = _job_posting_ld(root)
+        address = _ld_node(_ld_node(posting.get('jobLocation')).get('address'))
         
         # Basic info (prefer page data over preview)
-        job['title'] = response.css('h1.jd-header-title::text').get() or preview.get('title', '')
-        job['company'] = response.css('a.pad-rt-8::text').get() or preview.get('company', '')
-        job['location'] = response.css('span.loc::text').get() or preview.get('location', '')
+        job.title = (
+            posting.get('title')
+            or _first(_TITLE_XPATH, root) or preview.get('title', '')
+        )
+        job.company = (
+            _ld_node(posting.get('hiringOrganization')).get('name')
+            or _first(_COMPANY_XPATH, root) or preview.get('company', '')
+        )
+        job.location = (
+            address.get('addressLocality')
+            or _first(_LOCATION_XPATH, root) or preview.get('location', '')
+        )
+        job.posted_date = posting.get('datePosted')
         
         # Job description
-        desc_section = response.css('div.job-desc')
-        job['description'] = ' '.join(desc_section.css('::text').getall()).strip()
+        # Naukri's markup is full of whitespace-only text nodes; skip them while joining
+        job.description = ' '.join(
+            t.strip() for t in _DESC_TEXT_XPATH(root)
+            if not t.isspace()
+        )
         
         # Experience
-        exp_text = response.css('span.exp::text').get() or preview.get('experience', '')
-        job['experience_min'], job['experience_max'] = self._parse_experience(exp_text)
+        exp_text = _first(_EXP_XPATH, root) or preview.get('experience', '')
+        job.experience_min, job.experience_max = self._parse_experience(exp_text)
         
         # Salary
-        salary_text = response.css('span.salary::text').get() or preview.get('salary', '')
-        if salary_text and 'not disclosed' not in salary_text.lower():
-            job['salary_min'], job['salary_max'] = self._parse_salary(salary_text)
-            job['salary_currency'] = 'INR'
+        base_salary = _ld_node(posting.get('baseSalary'))
+        salary_range = self._parse_ld_salary(_ld_node(base_salary.get('value')))
+        if salary_range:
+            job.salary_min, job.salary_max = salary_range
+            job.salary_currency = base_salary.get('currency') or 'INR'
+        else:
+            salary_text = _first(_SALARY_XPATH, root) or preview.get('salary', '')
+            if salary_text and not _NOT_DISCLOSED_RE.search(salary_text):
+                job.salary_min, job.salary_max = self._parse_salary(salary_text)
+                job.salary_currency = 'INR'
         
         # Skills from tags
-        skills_tags = response.css('a.chip::text').getall() or preview.get('tags', [])
+        skills_tags = _CHIPS_XPATH(root) or preview.get('tags', [])
         if skills_tags:
-            job['skills_required'] = [s.strip().lower() for s in skills_tags]
+            # Tags repeat across listings; intern them so items share one string each
+            job.skills_required = [sys.intern(s.strip().lower()) for s in skills_tags]
         
         # Company details
-        job['company_rating'] = response.css('span.rating::text').get()
-        job['company_size'] = response.css('a[href*="company-"]::text').re_first(r'(\d+\+?\s*(?:employees)?)')
+        job.company_rating = _first(_RATING_XPATH, root)
+        job.company_size = next(
+            (m.group(1) for m in map(_COMPANY_SIZE_RE.search, _COMPANY_LINK_XPATH(root)) if m),
+            None,
+        )
         
-        # Employment type from keywords in description
-        desc_lower = job['description'].lower()
-        if 'full time' in desc_lower or 'full-time' in desc_lower:
-            job['employment_type'] = 'full-time'
-        elif 'internship' in desc_lower or 'intern' in desc_lower:
-            job['employment_type'] = 'internship'
+        # Employment type from keywords in description; full-time is the default and
+        # wins over a passing intern mention, so only scan for it when 'intern' hits
+        if _INTERN_RE.search(job.description) and not _FULL_TIME_RE.search(job.description):
+            job.employment_type = 'internship'
         else:
-            job['employment_type'] = 'full-time'  # default
+            job.employment_type = 'full-time'
         
         # Meta
-        job['source'] = 'naukri'
-        job['source_url'] = response.url
-        job['apply_url'] = response.url
-        job['scraped_at'] = datetime.utcnow().isoformat()
+        job.source = 'naukri'
+        job.source_url = response.url
+        job.apply_url = response.url
         
         yield job
     
     def _parse_experience(self, exp_text):
         """Parse experience range like '3-5 Yrs'"""
-        import re
-        match = re.search(r'(\d+)\s*-\s*(\d+)', exp_text)
+        match = _EXP_RANGE_RE.search(exp_text)
         if match:
             return int(match.group(1)), int(match.group(2))
-        match = re.search(r'(\d+)', exp_text)
+        match = _EXP_SINGLE_RE.search(exp_text)
         if match:
             exp = int(match.group(1))
             return exp, exp
         return None, None
     
+    def _parse_ld_salary(self, value):
+        """Parse a JSON-LD QuantitativeValue salary range, or None"""
+        try:
+            salary_min, salary_max = int(float(value['minValue'])), int(float(value['maxValue']))
+        except (KeyError, TypeError, ValueError):
+            return None
+        return (salary_min, salary_max) if salary_min and salary_max else None
+    
     def _parse_salary(self, salary_text):
         """Parse salary from Naukri format"""
-        import re
-        # "3,00,000 - 6,00,000 PA" or "5-8 Lacs PA"
-        lacs_match = re.search(r'(\d+)\s*-\s*(\d+)\s*lacs?', salary_text, re.I)
+        lacs_match = _LACS_RE.search(salary_text)
         if lacs_match:
             return int(lacs_match.group(1)) * 100000, int(lacs_match.group(2)) * 100000
         
-        rupee_match = re.search(r'₹?\s*(\d+(?:,\d+)*)\s*-\s*₹?\s*(\d+(?:,\d+)*)', salary_text)
+        rupee_match = _RUPEE_RE.search(salary_text)
         if rupee_match:
             return int(rupee_match.group(1).replace(',', '')), int(rupee_match.group(2).replace(',', ''))
         
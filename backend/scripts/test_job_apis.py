@@ -11,20 +11,24 @@ This script tests:
 3. JSearch API (if configured)
 4. Job matching service
 """
+import asyncio
+import functools
 import os
 import sys
+from typing import TYPE_CHECKING, Optional
 
 # Ensure we're in the backend directory for .env loading
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 os.chdir(backend_dir)
 sys.path.insert(0, backend_dir)
 
-# Load .env before importing app modules
+# Load .env before importing app modules; those are imported inside the
+# tests that use them, so running a single test skips the rest of the graph
 from dotenv import load_dotenv
 load_dotenv(override=True)
 
-from app.services.job_scraper_service import JobScraperService
-from app.services.job_matching_service import JobMatchingService, infer_experience_from_resume
+if TYPE_CHECKING:
+    from app.services.job_scraper_service import JobScraperService
 
 # Windows console compatibility - use ASCII instead of emoji
 OK = "[OK]"
@@ -38,16 +42,68 @@ def print_header(title: str):
     print(f"{'='*60}\n")
 
 
-def test_remotive_api():
+def _adzuna_configured() -> bool:
+    from app.core.config import settings
+    return bool(getattr(settings, 'ADZUNA_APP_ID', None) and getattr(settings, 'ADZUNA_APP_KEY', None))
+
+
+def _jsearch_configured() -> bool:
+    from app.core.config import settings
+    return bool(getattr(settings, 'JSEARCH_RAPIDAPI_KEY', None))
+
+
+# One scraper (and one HTTP session) for every probe, built on first use
+_SCRAPER: Optional["JobScraperService"] = None
+
+
+def _get_scraper() -> "JobScraperService":
+    global _SCRAPER
+    if _SCRAPER is None:
+        from app.services.job_scraper_service import JobScraperService
+        _SCRAPER = JobScraperService()
+    return _SCRAPER
+
+
+@functools.lru_cache(maxsize=8)
+def _fetch(provider: str, keywords: tuple, location: str):
+    """Fetch once per (provider, keywords, location); failures are not cached."""
+    # Bypass rate limiter for testing by calling the method directly
+    return getattr(_get_scraper(), f"_fetch_{provider}_jobs")(list(keywords), location)
+
+
+async def _probe(provider: str):
+    """Run one blocking portal fetch in a worker thread.
+
+    Returns the fetched jobs, or the exception the fetch raised.
+    """
+    try:
+        return await asyncio.to_thread(_fetch, provider, ("python", "developer"), "India")
+    except Exception as e:
+        return e
+
+
+async def probe_apis():
+    """Fetch from all three APIs concurrently; unconfigured APIs yield None."""
+    async def skipped():
+        return None
+
+    # Create the shared scraper here, before the fetches fan out to threads
+    _get_scraper()
+    return await asyncio.gather(
+        _probe("remotive"),
+        _probe("adzuna") if _adzuna_configured() else skipped(),
+        _probe("jsearch") if _jsearch_configured() else skipped(),
+    )
+
+
+def check_remotive_api(result):
     """Test Remotive API (should always work - no auth needed)."""
     print_header("Testing Remotive API (Free, No Auth)")
     
-    scraper = JobScraperService()
-    keywords = ["python", "developer"]
-    
     try:
-        # Bypass rate limiter for testing by calling the method directly
-        jobs = scraper._fetch_remotive_jobs(keywords, "India")
+        if isinstance(result, Exception):
+            raise result
+        jobs = result
         
         if jobs:
             print(f"{OK} Successfully fetched {len(jobs)} jobs from Remotive")
@@ -63,7 +119,7 @@ def test_remotive_api():
         print(f"{FAIL} Remotive API Error: {e}")
 
 
-def test_adzuna_api():
+def check_adzuna_api(result):
     """Test Adzuna API (requires ADZUNA_APP_ID and ADZUNA_APP_KEY)."""
     print_header("Testing Adzuna API")
     
@@ -72,7 +128,7 @@ def test_adzuna_api():
     app_id = getattr(settings, 'ADZUNA_APP_ID', None)
     app_key = getattr(settings, 'ADZUNA_APP_KEY', None)
     
-    if not app_id or not app_key:
+    if result is None:
         print(f"{WARN} Adzuna API not configured (missing ADZUNA_APP_ID or ADZUNA_APP_KEY)")
         print("   Set these in your .env file to enable Adzuna job fetching")
         print("   Sign up at: https://developer.adzuna.com/")
@@ -80,11 +136,10 @@ def test_adzuna_api():
     
     print(f"  Found API keys: app_id={app_id}, app_key={app_key[:10]}...")
     
-    scraper = JobScraperService()
-    keywords = ["python", "developer"]
-    
     try:
-        jobs = scraper._fetch_adzuna_jobs(keywords, "India")
+        if isinstance(result, Exception):
+            raise result
+        jobs = result
         
         if jobs:
             print(f"{OK} Successfully fetched {len(jobs)} jobs from Adzuna")
@@ -101,7 +156,7 @@ def test_adzuna_api():
         print(f"{FAIL} Adzuna API Error: {e}")
 
 
-def test_jsearch_api():
+def check_jsearch_api(result):
     """Test JSearch RapidAPI (requires JSEARCH_RAPIDAPI_KEY)."""
     print_header("Testing JSearch API (RapidAPI)")
     
@@ -109,7 +164,7 @@ def test_jsearch_api():
     
     api_key = getattr(settings, 'JSEARCH_RAPIDAPI_KEY', None)
     
-    if not api_key:
+    if result is None:
         print(f"{WARN} JSearch API not configured (missing JSEARCH_RAPIDAPI_KEY)")
         print("   Set this in your .env file to enable JSearch job fetching")
         print("   Sign up at: https://rapidapi.com/letscrape-6bRBa3QguO5/api/jsearch")
@@ -117,11 +172,10 @@ def test_jsearch_api():
     
     print(f"  Found API key: {api_key[:15]}...")
     
-    scraper = JobScraperService()
-    keywords = ["python", "developer"]
-    
     try:
-        jobs = scraper._fetch_jsearch_jobs(keywords, "India")
+        if isinstance(result, Exception):
+            raise result
+        jobs = result
         
         if jobs:
             print(f"{OK} Successfully fetched {len(jobs)} jobs from JSearch")
@@ -136,10 +190,26 @@ def test_jsearch_api():
         print(f"{FAIL} JSearch API Error: {e}")
 
 
+# Zero-argument entry points, so pytest can run one portal on its own
+# (e.g. -k remotive) without the others' fetches
+def test_remotive_api():
+    check_remotive_api(asyncio.run(_probe("remotive")))
+
+
+def test_adzuna_api():
+    check_adzuna_api(asyncio.run(_probe("adzuna")) if _adzuna_configured() else None)
+
+
+def test_jsearch_api():
+    check_jsearch_api(asyncio.run(_probe("jsearch")) if _jsearch_configured() else None)
+
+
 def test_job_matching():
     """Test job matching service with sample data."""
     print_header("Testing Job Matching Service")
     
+    from app.services.job_matching_service import JobMatchingService
+    
     matcher = JobMatchingService()
     
     # Sample resume data
@@ -216,6 +286,8 @@ def test_experience_inference():
     """Test experience inference from resume text."""
     print_header("Testing Experience Inference")
     
+    from app.services.job_matching_service import infer_experience_from_resume
+    
     test_cases = [
         ("I am a fresher with a B.Tech in Computer Science", "fresher"),
         ("5+ years of experience in software development", "senior"),
@@ -236,10 +308,14 @@ def main():
     print("  JOB PORTAL API INTEGRATION TESTS")
     print("="*60)
     
+    # The API probes are network-bound; fetch them concurrently, then
+    # report in order so the output stays readable
+    remotive, adzuna, jsearch = asyncio.run(probe_apis())
+    
     # Run all tests
-    test_remotive_api()
-    test_adzuna_api()
-    test_jsearch_api()
+    check_remotive_api(remotive)
+    check_adzuna_api(adzuna)
+    check_jsearch_api(jsearch)
     test_job_matching()
     test_experience_inference()
     
@@ -13,35 +13,50 @@ from app.services.speech_service import speech_service
 from app.services.interview_ai_service import interview_ai_service
 
 
+async def probe(coro, timeout):
+    """Await one check with its own timeout; return its result or the exception"""
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except Exception as e:
+        return e
+
+
 async def test_api_keys():
     """Quick test to validate API keys"""
     print("\n" + "="*60)
     print("API KEY VALIDATION TEST")
     print("="*60)
     
+    # Tests 1-3 are independent network checks; run them together and
+    # report in order below
+    health, result, ai_health = await asyncio.gather(
+        probe(speech_service.health_check(), 5),
+        probe(speech_service.synthesize_speech(text="Hello", voice="professional"), 10),
+        probe(interview_ai_service.health_check(), 5),
+    )
+    
     # Test 1: Speech Services Health Check
     print("\n1️⃣ Testing Speech Services...")
-    health = await speech_service.health_check()
-    print(f"   STT Provider: {health.get('stt_provider', 'None')}")
-    print(f"   TTS Provider: {health.get('tts_provider', 'None')}")
+    if isinstance(health, Exception):
+        print(f"   ❌ Speech Health Check Error: {health!r}")
+    else:
+        print(f"   STT Provider: {health.get('stt_provider', 'None')}")
+        print(f"   TTS Provider: {health.get('tts_provider', 'None')}")
     
     # Test 2: TTS (Free - edge-tts)
     print("\n2️⃣ Testing TTS (edge-tts - Free)...")
-    try:
-        result = await speech_service.synthesize_speech(
-            text="Hello",
-            voice="professional"
-        )
-        if result['success']:
-            print(f"   ✅ TTS Working! Generated {len(result['audio'])//1000}KB audio")
-        else:
-            print(f"   ❌ TTS Failed: {result['error']}")
-    except Exception as e:
-        print(f"   ❌ TTS Error: {str(e)}")
+    if isinstance(result, Exception):
+        print(f"   ❌ TTS Error: {result!r}")
+    elif result['success']:
+        print(f"   ✅ TTS Working! Generated {len(result['audio'])//1000}KB audio")
+    else:
+        print(f"   ❌ TTS Failed: {result['error']}")
     
     # Test 3: AI Service Health Check
     print("\n3️⃣ Testing AI Service...")
-    ai_health = await interview_ai_service.health_check()
+    if isinstance(ai_health, Exception):
+        print(f"   ❌ AI Health Check Error: {ai_health!r}")
+        ai_health = {}
     print(f"   Provider: {ai_health.get('provider', 'None')}")
     print(f"   Model: {ai_health.get('model', 'None')}")
     print(f"   Available: {ai_health.get('available', False)}")
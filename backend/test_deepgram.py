@@ -15,6 +15,34 @@ except ImportError:
 
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 
+# Resolve optional SDKs once; each test reports its own import error
+try:
+    from deepgram import DeepgramClient
+    DEEPGRAM_IMPORT_ERROR = None
+except ImportError as e:
+    DeepgramClient = None
+    DEEPGRAM_IMPORT_ERROR = e
+
+try:
+    import edge_tts
+    EDGE_TTS_IMPORT_ERROR = None
+except ImportError as e:
+    edge_tts = None
+    EDGE_TTS_IMPORT_ERROR = e
+
+# livekit-api package first, then the livekit package's api module
+try:
+    from livekit.api import AccessToken, VideoGrants
+    LIVEKIT_IMPORT_ERROR = None
+except ImportError:
+    try:
+        from livekit import api as _livekit_api
+        AccessToken, VideoGrants = _livekit_api.AccessToken, _livekit_api.VideoGrants
+        LIVEKIT_IMPORT_ERROR = None
+    except (ImportError, AttributeError) as e:
+        AccessToken = VideoGrants = None
+        LIVEKIT_IMPORT_ERROR = e
+
 async def test_stt():
     """Test Deepgram Speech-to-Text"""
     print("\n" + "="*50)
@@ -26,7 +54,8 @@ async def test_stt():
         return False
     
     try:
-        from deepgram import DeepgramClient
+        if DEEPGRAM_IMPORT_ERROR:
+            raise DEEPGRAM_IMPORT_ERROR
         
         # v5 SDK: pass API key as keyword argument
         client = DeepgramClient(api_key=DEEPGRAM_API_KEY)
@@ -62,7 +91,8 @@ async def test_tts():
     print("="*50)
     
     try:
-        import edge_tts
+        if EDGE_TTS_IMPORT_ERROR:
+            raise EDGE_TTS_IMPORT_ERROR
         
         text = "Hello! I am your AI interviewer. Let's begin the mock interview."
         voice = "en-US-AriaNeural"
@@ -112,26 +142,16 @@ async def test_livekit():
     if not all([livekit_url, livekit_api_key, livekit_api_secret]):
         return False
     
-    # Test token generation with multiple SDK versions
+    # Test token generation with whichever SDK resolved at import
     try:
-        # Try livekit-api package first
-        try:
-            from livekit.api import AccessToken, VideoGrants
-            
-            token = AccessToken(livekit_api_key, livekit_api_secret)
-            token.with_identity("test-user").with_name("Test User")
-            token.with_grants(VideoGrants(room_join=True, room="test-room"))
-            jwt_token = token.to_jwt()
-            
-        except (ImportError, AttributeError):
-            # Try livekit package with api module
-            from livekit import api
-            
-            token = api.AccessToken(livekit_api_key, livekit_api_secret)
-            token.with_identity("test-user")
-            token.with_name("Test User")
-            token.with_grants(api.VideoGrants(room_join=True, room="test-room"))
-            jwt_token = token.to_jwt()
+        if LIVEKIT_IMPORT_ERROR:
+            raise LIVEKIT_IMPORT_ERROR
+        
+        token = AccessToken(livekit_api_key, livekit_api_secret)
+        token.with_identity("test-user")
+        token.with_name("Test User")
+        token.with_grants(VideoGrants(room_join=True, room="test-room"))
+        jwt_token = token.to_jwt()
         
         print(f"✅ Token generation working! Token length: {len(jwt_token)}")
         return True
@@ -6,6 +6,8 @@ Tests: Deepgram STT, edge-tts TTS, Gemini AI, Concurrency Control
 import asyncio
 import sys
 import os
+import time
+import traceback
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -14,62 +16,83 @@ from app.services.speech_service import speech_service
 from app.services.interview_ai_service import interview_ai_service, InterviewPersona
 from app.models.interview import InterviewType, DifficultyLevel
 
+# key -> (started_at, health_check task); stages share one probe per service
+_health_cache = {}
+
+
+async def cached_health(service, key, ttl=10):
+    """Return service.health_check(), reusing a probe started under ttl seconds ago"""
+    entry = _health_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= ttl:
+        # Cache the task rather than its result so concurrent callers share it
+        entry = (time.monotonic(), asyncio.ensure_future(service.health_check()))
+        _health_cache[key] = entry
+    return await entry[1]
+
 
 async def test_speech_services():
     """Test STT and TTS services"""
-    print("\n" + "="*60)
-    print("TESTING SPEECH SERVICES")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("TESTING SPEECH SERVICES")
+    out("="*60)
     
     # Health check
-    health = await speech_service.health_check()
-    print(f"\n📊 Speech Service Health:")
-    print(f"  STT Available: {health['stt_available']} (Provider: {health['stt_provider']})")
-    print(f"  TTS Available: {health['tts_available']} (Provider: {health['tts_provider']})")
+    health = await cached_health(speech_service, "speech")
+    out(f"\n📊 Speech Service Health:")
+    out(f"  STT Available: {health['stt_available']} (Provider: {health['stt_provider']})")
+    out(f"  TTS Available: {health['tts_available']} (Provider: {health['tts_provider']})")
     if health.get('tts_fallback'):
-        print(f"  TTS Fallback: {health['tts_fallback']}")
+        out(f"  TTS Fallback: {health['tts_fallback']}")
     
     # Test TTS
     if health['tts_available']:
-        print(f"\n🔊 Testing TTS with edge-tts...")
+        out(f"\n🔊 Testing TTS with edge-tts...")
         result = await speech_service.synthesize_speech(
             text="Hello! Welcome to your mock interview. Let's begin with your first question.",
             voice="professional"
         )
         if result['success']:
             audio_size = len(result['audio']) if not isinstance(result['audio'], str) else len(result['audio']) // 1.33  # base64 ~33% overhead
-            print(f"  ✅ TTS Success! Audio size: ~{int(audio_size)} bytes")
+            out(f"  ✅ TTS Success! Audio size: ~{int(audio_size)} bytes")
         else:
-            print(f"  ❌ TTS Failed: {result['error']}")
+            out(f"  ❌ TTS Failed: {result['error']}")
     
     # Get voice options
     voices = await speech_service.get_voice_options()
-    print(f"\n🎤 Available Voices: {len(voices)}")
+    out(f"\n🎤 Available Voices: {len(voices)}")
     for voice in voices[:3]:
-        print(f"  - {voice['name']}: {voice['description']}")
+        out(f"  - {voice['name']}: {voice['description']}")
+    
+    return "\n".join(lines)
 
 
 async def test_ai_service():
     """Test Gemini AI service"""
-    print("\n" + "="*60)
-    print("TESTING AI SERVICE (GEMINI)")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("TESTING AI SERVICE (GEMINI)")
+    out("="*60)
     
     # Health check
-    health = await interview_ai_service.health_check()
-    print(f"\n📊 AI Service Health:")
-    print(f"  Available: {health['available']}")
-    print(f"  Provider: {health['provider']}")
-    print(f"  Model: {health['model']}")
+    health = await cached_health(interview_ai_service, "ai")
+    out(f"\n📊 AI Service Health:")
+    out(f"  Available: {health['available']}")
+    out(f"  Provider: {health['provider']}")
+    out(f"  Model: {health['model']}")
     if health.get('concurrency_limit'):
-        print(f"  Concurrency Limit: {health['concurrency_limit']}")
+        out(f"  Concurrency Limit: {health['concurrency_limit']}")
     
     if not health['available']:
-        print("  ⚠️  AI service not configured - skipping tests")
-        return
+        out("  ⚠️  AI service not configured - skipping tests")
+        return "\n".join(lines)
     
     # Test question generation
-    print(f"\n📝 Testing Question Generation...")
+    out(f"\n📝 Testing Question Generation...")
     try:
         questions = await interview_ai_service.generate_questions(
             interview_type=InterviewType.BEHAVIORAL,
@@ -77,14 +100,14 @@ async def test_ai_service():
             num_questions=3,
             difficulty=DifficultyLevel.INTERMEDIATE
         )
-        print(f"  ✅ Generated {len(questions)} questions")
+        out(f"  ✅ Generated {len(questions)} questions")
         for i, q in enumerate(questions, 1):
-            print(f"  {i}. {q['question'][:80]}...")
+            out(f"  {i}. {q['question'][:80]}...")
     except Exception as e:
-        print(f"  ❌ Question generation failed: {str(e)}")
+        out(f"  ❌ Question generation failed: {str(e)}")
     
     # Test response generation
-    print(f"\n💬 Testing Response Generation...")
+    out(f"\n💬 Testing Response Generation...")
     try:
         response = await interview_ai_service.generate_response(
             user_transcript="I have 5 years of experience in backend development, focusing on Python and FastAPI.",
@@ -93,14 +116,14 @@ async def test_ai_service():
             next_question="What are your key strengths?",
             persona=InterviewPersona.PROFESSIONAL
         )
-        print(f"  ✅ Response generated:")
-        print(f"     {response['response']}")
-        print(f"     Should follow up: {response['should_follow_up']}")
+        out(f"  ✅ Response generated:")
+        out(f"     {response['response']}")
+        out(f"     Should follow up: {response['should_follow_up']}")
     except Exception as e:
-        print(f"  ❌ Response generation failed: {str(e)}")
+        out(f"  ❌ Response generation failed: {str(e)}")
     
     # Test response analysis
-    print(f"\n📊 Testing Response Analysis...")
+    out(f"\n📊 Testing Response Analysis...")
     try:
         analysis = await interview_ai_service.analyze_response(
             question="Tell me about a challenging project you worked on",
@@ -108,50 +131,75 @@ async def test_ai_service():
             expected_skills=["technical leadership", "problem-solving"],
             evaluation_criteria=["STAR method", "specific examples"]
         )
-        print(f"  ✅ Analysis completed:")
-        print(f"     Clarity: {analysis['scores']['clarity']}/100")
-        print(f"     Relevance: {analysis['scores']['relevance']}/100")
-        print(f"     Depth: {analysis['scores']['depth']}/100")
-        print(f"     Strengths: {', '.join(analysis['strengths'][:2])}")
+        out(f"  ✅ Analysis completed:")
+        out(f"     Clarity: {analysis['scores']['clarity']}/100")
+        out(f"     Relevance: {analysis['scores']['relevance']}/100")
+        out(f"     Depth: {analysis['scores']['depth']}/100")
+        out(f"     Strengths: {', '.join(analysis['strengths'][:2])}")
     except Exception as e:
-        print(f"  ❌ Analysis failed: {str(e)}")
+        out(f"  ❌ Analysis failed: {str(e)}")
+    
+    return "\n".join(lines)
 
 
 async def test_concurrency():
     """Test concurrency control with Gemini"""
-    print("\n" + "="*60)
-    print("TESTING CONCURRENCY CONTROL")
-    print("="*60)
+    lines = []
+    out = lines.append
+    
+    out("\n" + "="*60)
+    out("TESTING CONCURRENCY CONTROL")
+    out("="*60)
     
-    health = await interview_ai_service.health_check()
+    health = await cached_health(interview_ai_service, "ai")
     if not health['available'] or health['provider'] != 'gemini':
-        print("  ⚠️  Gemini not configured - skipping concurrency tests")
-        return
+        out("  ⚠️  Gemini not configured - skipping concurrency tests")
+        return "\n".join(lines)
     
-    print(f"\n🔄 Testing concurrent requests (limit: {health.get('concurrency_limit', 10)})...")
+    limit = health.get('concurrency_limit') or 10
+    out(f"\n🔄 Testing concurrent requests (limit: {limit})...")
+
+    # One request up front so client setup (auth, connection) isn't charged
+    # to whichever concurrent request happens to run first
+    try:
+        await interview_ai_service.generate_response(
+            user_transcript="warmup",
+            conversation_history=[],
+            current_question="",
+            next_question="",
+            persona=InterviewPersona.PROFESSIONAL
+        )
+    except Exception as e:
+        out(f"  ⚠️  Warm-up request failed: {str(e)[:50]}")
+
+    # Hold in-flight requests to the declared limit and send twice that many,
+    # so the run actually saturates the bound and then queues behind it
+    sem = asyncio.Semaphore(limit)
     
     async def make_request(idx):
         try:
-            result = await interview_ai_service.generate_response(
-                user_transcript=f"Test response {idx}",
-                conversation_history=[],
-                current_question="Test question",
-                next_question="Next question",
-                persona=InterviewPersona.PROFESSIONAL
-            )
+            async with sem:
+                result = await interview_ai_service.generate_response(
+                    user_transcript=f"Test response {idx}",
+                    conversation_history=[],
+                    current_question="Test question",
+                    next_question="Next question",
+                    persona=InterviewPersona.PROFESSIONAL
+                )
             return f"Request {idx}: ✅ Success"
         except Exception as e:
             return f"Request {idx}: ❌ {str(e)[:50]}"
     
-    # Fire 5 concurrent requests
-    tasks = [make_request(i) for i in range(5)]
+    tasks = [make_request(i) for i in range(2 * limit)]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
     for result in results:
         if isinstance(result, Exception):
-            print(f"  ❌ {str(result)}")
+            out(f"  ❌ {str(result)}")
         else:
-            print(f"  {result}")
+            out(f"  {result}")
+    
+    return "\n".join(lines)
 
 
 async def main():
@@ -161,19 +209,34 @@ async def main():
     print("="*60)
     
     try:
-        await test_speech_services()
-        await test_ai_service()
-        await test_concurrency()
+        # Stages are independent and network-bound: run them together, each
+        # buffering its own output, then print the reports in order
+        reports = await asyncio.gather(
+            test_speech_services(),
+            test_ai_service(),
+            test_concurrency(),
+            return_exceptions=True,
+        )
+        # Assemble the whole report and write it once rather than flushing
+        # stdout line by line
+        lines = []
+        out = lines.append
+        for report in reports:
+            if isinstance(report, Exception):
+                out(f"\n❌ Test stage failed: {str(report)}")
+                out("".join(traceback.format_exception(report)).rstrip())
+            else:
+                out(report)
         
-        print("\n" + "="*60)
-        print("✅ ALL TESTS COMPLETED")
-        print("="*60)
-        print("\nNote: Some tests may fail if API keys are not configured.")
-        print("Configure .env with GEMINI_API_KEY and DEEPGRAM_API_KEY for full functionality.\n")
+        out("\n" + "="*60)
+        out("✅ ALL TESTS COMPLETED")
+        out("="*60)
+        out("\nNote: Some tests may fail if API keys are not configured.")
+        out("Configure .env with GEMINI_API_KEY and DEEPGRAM_API_KEY for full functionality.\n")
+        print("\n".join(lines))
         
     except Exception as e:
         print(f"\n❌ Test suite failed: {str(e)}")
-        import traceback
         traceback.print_exc()
 
 
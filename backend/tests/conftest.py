@@ -1,12 +1,18 @@
 """Pytest configuration and fixtures"""
 
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.main import app
-from app.db.database import Base, get_db
-from app.core.config import settings
+import os
+
+# Cheapest bcrypt work factor for test hashes; must be set before app.core.config
+# loads, so the imports below have to follow it
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from app.main import app  # noqa: E402
+from app.db.database import Base, get_db  # noqa: E402
+from app.core.config import settings  # noqa: E402
 
 # Test database URL
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -30,8 +36,15 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="session")
+def app_client():
+    """One TestClient for the session, so the app lifespan runs once rather than per test"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(app_client, db_session):
     """Create a test client with database override"""
     def override_get_db():
         try:
@@ -40,11 +53,14 @@ def client(db_session):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    default_headers = app_client.headers.copy()
     
-    with TestClient(app) as test_client:
-        yield test_client
+    yield app_client
     
+    # Undo per-test state on the shared client (auth headers, cookies)
     app.dependency_overrides.clear()
+    app_client.headers = default_headers
+    app_client.cookies.clear()
 
 
 @pytest.fixture
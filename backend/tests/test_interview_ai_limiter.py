@@ -0,0 +1,53 @@
+"""Tests for the client-side token-bucket limiter used for Gemini calls."""
+import asyncio
+import time
+
+import pytest
+
+from app.services.interview_ai_service import AsyncTokenBucket
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Drive time.monotonic from asyncio.sleep so pacing is exact, not wall-clock"""
+    clock = [0.0]
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        if delay > 0:
+            clock[0] += delay
+            if clock[0] > 3600:
+                raise AssertionError("limiter never released a token")
+        await real_sleep(0)
+
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return clock
+
+
+def _acquire_times(limiter_args, calls, clock):
+    async def run():
+        limiter = AsyncTokenBucket(**limiter_args)
+        stamps = []
+        for _ in range(calls):
+            async with limiter:
+                stamps.append(clock[0])
+        return stamps
+
+    return asyncio.run(run())
+
+
+def test_token_bucket_allows_burst_then_paces(fake_clock):
+    stamps = _acquire_times({"rate": 20, "capacity": 2}, 4, fake_clock)
+    # The first two calls use the burst capacity; the rest wait 1/rate each
+    assert stamps[:2] == [0.0, 0.0]
+    assert stamps[2] == pytest.approx(0.05)
+    assert stamps[3] == pytest.approx(0.10)
+
+
+def test_token_bucket_rate_below_one_per_second(fake_clock):
+    stamps = _acquire_times({"rate": 0.25}, 3, fake_clock)
+    # Capacity defaults to one token, so a 15 RPM limit still lets calls through
+    assert stamps[0] == 0.0
+    assert stamps[1] == pytest.approx(4.0)
+    assert stamps[2] == pytest.approx(8.0)
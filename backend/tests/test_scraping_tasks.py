@@ -0,0 +1,51 @@
+"""Tests for batched job ingestion in scraping tasks."""
+from app.models.job import Job
+from app.tasks.scraping_tasks import insert_new_jobs
+
+
+def _row(title, company, url):
+    return {
+        "title": title,
+        "company": company,
+        "source_url": url,
+        "apply_url": url,
+        "skills_required": [],
+        "is_active": True,
+    }
+
+
+def test_insert_new_jobs_skips_existing_and_batch_duplicates(db_session):
+    db_session.add(Job(title="Backend Engineer", company="Acme", source_url="https://x/1"))
+    db_session.commit()
+
+    rows = [
+        _row("Backend Engineer", "Acme", "https://x/2"),   # same title + company as stored
+        _row("Data Engineer", "Initech", "https://x/1"),   # same URL as stored
+        _row("SDE", "Globex", "https://x/3"),
+        _row("SDE", "Globex", "https://x/4"),              # repeats a row earlier in the batch
+        _row("QA Engineer", "Globex", "https://x/5"),
+    ]
+    inserted = insert_new_jobs(db_session, rows)
+    db_session.commit()
+
+    assert inserted == 2
+    urls = {url for (url,) in db_session.query(Job.source_url)}
+    assert urls == {"https://x/1", "https://x/3", "https://x/5"}
+
+
+def test_insert_new_jobs_empty(db_session):
+    assert insert_new_jobs(db_session, []) == 0
+
+
+def test_insert_new_jobs_drops_only_the_bad_row(db_session):
+    rows = [
+        _row("SDE", "Globex", "https://x/3"),
+        _row("QA Engineer", None, "https://x/4"),          # violates NOT NULL company
+        _row("Data Engineer", "Initech", "https://x/5"),
+    ]
+    inserted = insert_new_jobs(db_session, rows)
+    db_session.commit()
+
+    assert inserted == 2
+    urls = {url for (url,) in db_session.query(Job.source_url)}
+    assert urls == {"https://x/3", "https://x/5"}
@@ -0,0 +1,218 @@
+"""
+Helpers shared by the DO GenAI actions in packages/ai
+
+Each action lists this file in its .include, so the build copies it next to
+the action's __main__.py; the actions stay stdlib-only and standalone once
+deployed, but a fix here reaches all of them.
+"""
+
+import json
+import ssl
+import time
+import hashlib
+import http.client
+from collections import OrderedDict
+
+
+GENAI_HOST = "inference.do-ai.run"
+GENAI_PATH = "/v1/chat/completions"
+
+# Reuse one compact encoder instead of letting json.dumps build a new one per
+# call; non-ASCII text goes out as UTF-8 bytes rather than six-byte \uXXXX
+# escapes
+REQUEST_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# Built once per container: creating a context loads and parses the CA bundle.
+# Reconnects after an idle drop reuse it instead of rebuilding one
+SSL_CTX = ssl.create_default_context()
+
+# Module state survives between warm invocations, so keep idle HTTPS
+# connections open instead of paying DNS + TCP + TLS setup on every call.
+# list.pop/append are atomic, so an action's worker threads can share it
+_idle_conns = []
+
+
+def open_chat_completion(request_data, api_key, timeout=30, headers=None):
+    """
+    POST a chat completion over a kept-alive connection; returns (connection, unread response)
+
+    headers are added to the defaults (e.g. Accept-Encoding). Hand the pair
+    to release_connection once the response has been read.
+    """
+    request_headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    if headers:
+        request_headers.update(headers)
+    for attempt in range(2):
+        conn = None
+        if not attempt:
+            try:
+                conn = _idle_conns.pop()
+            except IndexError:
+                pass
+        if conn is None:
+            # After a dropped connection the other idle ones are likely stale
+            # too, so the reconnect always opens a fresh one
+            conn = http.client.HTTPSConnection(GENAI_HOST, timeout=timeout, context=SSL_CTX)
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        try:
+            conn.request("POST", GENAI_PATH, body=request_data, headers=request_headers)
+            return conn, conn.getresponse()
+        except (ConnectionResetError, BrokenPipeError):
+            # The server dropped the idle connection between invocations; reconnect once
+            conn.close()
+            if attempt:
+                raise
+        except Exception:
+            conn.close()
+            raise
+
+
+def release_connection(conn, response):
+    """Keep the connection for reuse if its response was read to the end, else drop it"""
+    if response.isclosed():
+        _idle_conns.append(conn)
+    else:
+        conn.close()
+
+
+def post_chat_completion(request_data, api_key, timeout=30, headers=None):
+    """POST a chat completion and read the whole reply; returns (response, body bytes)"""
+    conn, response = open_chat_completion(request_data, api_key, timeout, headers)
+    try:
+        return response, response.read()
+    finally:
+        release_connection(conn, response)
+
+
+def read_streamed_json(response):
+    """
+    Accumulate streamed (SSE) content deltas until the first top-level JSON
+    object closes, without waiting for the rest of the generation.
+
+    Braces inside JSON string values (e.g. "feedback": "use {placeholders}")
+    are skipped, so they can't open or close the object early.
+
+    If the stream ends while the object is still open outside a string, the
+    missing braces are added.
+
+    Returns (content, json_text); json_text is None if no object was found.
+    """
+    parts = []
+    offset = 0
+    depth = 0
+    start = None
+    # String state carries across deltas; a token can end mid-escape
+    in_string = False
+    escaped = False
+    for line in response:
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        delta = ((chunk.get("choices") or [{}])[0].get("delta") or {}).get("content") or ""
+        for i, char in enumerate(delta):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                # Quotes only delimit strings inside the object; prose before
+                # it may quote freely
+                in_string = depth > 0
+            elif char == '{':
+                if depth == 0:
+                    start = offset + i
+                depth += 1
+            elif char == '}' and depth:
+                depth -= 1
+                if depth == 0:
+                    parts.append(delta[:i + 1])
+                    content = ''.join(parts)
+                    return content, content[start:]
+        parts.append(delta)
+        offset += len(delta)
+    # Consume the end of the stream so the connection can carry the next request
+    response.read()
+    content = ''.join(parts)
+    if start is None or in_string:
+        return content, None
+    return content, content[start:] + '}' * depth
+
+
+def compact_text(text, max_chars):
+    """
+    Squeeze whitespace and fit text into max_chars by dropping whole lines.
+
+    Extracted resumes are padded with spaces, tabs and blank lines that cost
+    tokens without adding content; a plain slice would also cut mid-sentence.
+    """
+    kept = []
+    used = 0
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if not line:
+            continue
+        if used + len(line) > max_chars:
+            if not kept:
+                # A single line longer than the budget; nothing better to cut on
+                kept.append(line[:max_chars])
+            break
+        kept.append(line)
+        used += len(line) + 1
+    return '\n'.join(kept)
+
+
+def cache_key(*parts):
+    """Content hash of the inputs; parts are NUL-separated so they can't run together"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.digest()
+
+
+class ResponseCache:
+    """
+    In-process LRU of results with a TTL, for one warm container.
+
+    Not locked: get/put run on the invocation's main thread only.
+    """
+
+    def __init__(self, ttl_seconds, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
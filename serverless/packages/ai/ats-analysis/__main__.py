@@ -6,47 +6,77 @@ Provides: ATS compatibility score, section scores, keyword analysis, and recomme
 
 import os
 import json
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 
+from genai_common import (
+    REQUEST_ENCODER, ResponseCache, cache_key, compact_text,
+    open_chat_completion, read_streamed_json, release_connection,
+)
 
-def main(args):
+
+# Runs the keyword request alongside the scoring request; kept across warm
+# invocations so the worker thread is reused
+_executor = ThreadPoolExecutor(max_workers=1)
+
+# Parsed analyses keyed by a hash of (resume, job description). Re-scoring the
+# same inputs (UI refreshes) is common and each LLM call takes seconds
+CACHE_TTL_SECONDS = 3600
+_analysis_cache = ResponseCache(CACHE_TTL_SECONDS)
+
+
+# Prompt budgets for the inputs, in characters (roughly 4 per token)
+RESUME_CHAR_BUDGET = 5000
+JD_CHAR_BUDGET = 1500
+
+
+# Text this thin is not a resume (a stray heading or contact line); answer
+# it locally instead of spending an LLM round trip on it. Kept well below a
+# one-page resume, so short but real resumes still reach the model
+QUICK_REJECT_MIN_WORDS = 25
+
+
+def quick_reject(resume_text):
     """
-    Balanced ATS analysis focusing on content quality over strict formatting
-    
-    Args:
-        resume_text: The extracted text from the resume
-        job_description: Optional job description for keyword matching
-    
-    Returns:
-        ats_score: Overall score (0-100)
-        section_scores: Individual section ratings
-        keyword_analysis: Keywords found and missing
-        recommendations: Prioritized improvement suggestions
+    Return a fixed low-score analysis for near-empty text, or None if it
+    should go to the model.
+
+    The result carries "heuristic": True, so callers can tell it from a
+    model-scored analysis.
     """
-    resume_text = args.get("resume_text", "")
-    job_description = args.get("job_description", "")
-    
-    if not resume_text or len(resume_text.strip()) < 50:
-        return {
-            "statusCode": 400,
-            "body": {"error": "Resume text is required and must be at least 50 characters"}
-        }
-    
-    api_key = os.environ.get("DO_GENAI_API_KEY")
-    if not api_key:
-        return {
-            "statusCode": 500,
-            "body": {"error": "DO_GENAI_API_KEY not configured"}
-        }
-    
-    # Balanced scoring prompt - focuses on content quality
-    prompt = f"""You are a fair and balanced resume analyzer. Score this resume based primarily on CONTENT QUALITY, not formatting strictness.
+    if len(resume_text.split()) >= QUICK_REJECT_MIN_WORDS:
+        return None
+    return {
+        "heuristic": True,
+        "ats_score": 25,
+        "section_scores": [
+            {"section": "Work Experience", "score": 20, "status": "Weak", "feedback": "No work history found"},
+            {"section": "Skills & Expertise", "score": 30, "status": "Weak", "feedback": "Too little content to assess skills"},
+            {"section": "Education", "score": 25, "status": "Weak", "feedback": "No education found"},
+            {"section": "Clarity", "score": 35, "status": "Fair", "feedback": "Not enough structured content to evaluate"},
+            {"section": "Impact", "score": 15, "status": "Weak", "feedback": "No measurable achievements found"}
+        ],
+        "keyword_analysis": {
+            "found": [],
+            "missing": [],
+            "density_score": 10
+        },
+        "recommendations": [
+            {"priority": "High", "category": "Experience", "text": "Add your work history with company names, job titles and dates", "impact": "+25 points"},
+            {"priority": "High", "category": "Content", "text": "Expand the resume with skills, projects and education details", "impact": "+20 points"},
+            {"priority": "Medium", "category": "Impact", "text": "Describe achievements with specific metrics", "impact": "+10 points"}
+        ],
+        "summary": "Resume is too short to analyze. Add more detail about your experience, skills and education."
+    }
+
+
+# Balanced scoring prompt - focuses on content quality. Built once at import;
+# only the resume, job description and response format slots are filled per call
+PROMPT_TEMPLATE = """You are a fair and balanced resume analyzer. Score this resume based primarily on CONTENT QUALITY, not formatting strictness.
 
 Resume:
-{resume_text[:5000]}
+{resume}
 
-{("Job Description for context:" + job_description[:1500]) if job_description else ""}
+{jd_block}
 
 SCORING GUIDELINES (be fair, not harsh):
 - A resume with solid experience and skills should score 65-80 even without perfect formatting
@@ -70,68 +100,195 @@ A resume with:
 - Education = add 5-10
 
 Respond with ONLY valid JSON:
-{{
-  "ats_score": 75,
+{response_format}"""
+
+# Substituted into PROMPT_TEMPLATE as values, so braces are literal here
+_SCORES_FORMAT = """  "ats_score": 75,
   "section_scores": [
-    {{"section": "Work Experience", "score": 80, "status": "Strong", "feedback": "Good career progression shown"}},
-    {{"section": "Skills & Expertise", "score": 75, "status": "Good", "feedback": "Solid technical foundation"}},
-    {{"section": "Education", "score": 85, "status": "Strong", "feedback": "Relevant degree"}},
-    {{"section": "Clarity", "score": 70, "status": "Good", "feedback": "Well organized"}},
-    {{"section": "Impact", "score": 65, "status": "Fair", "feedback": "Could add more metrics"}}
-  ],
-  "keyword_analysis": {{
+    {"section": "Work Experience", "score": 80, "status": "Strong", "feedback": "Good career progression shown"},
+    {"section": "Skills & Expertise", "score": 75, "status": "Good", "feedback": "Solid technical foundation"},
+    {"section": "Education", "score": 85, "status": "Strong", "feedback": "Relevant degree"},
+    {"section": "Clarity", "score": 70, "status": "Good", "feedback": "Well organized"},
+    {"section": "Impact", "score": 65, "status": "Fair", "feedback": "Could add more metrics"}
+  ],"""
+
+_KEYWORDS_FORMAT = """  "keyword_analysis": {
     "found": ["python", "javascript", "team leadership"],
     "missing": ["agile", "CI/CD"],
     "density_score": 70
-  }},
-  "recommendations": [
-    {{"priority": "Medium", "category": "Impact", "text": "Add specific metrics to achievements", "impact": "+5 points"}},
-    {{"priority": "Low", "category": "Keywords", "text": "Consider adding industry buzzwords", "impact": "+3 points"}}
+  }"""
+
+_REVIEW_FORMAT = """  "recommendations": [
+    {"priority": "Medium", "category": "Impact", "text": "Add specific metrics to achievements", "impact": "+5 points"},
+    {"priority": "Low", "category": "Keywords", "text": "Consider adding industry buzzwords", "impact": "+3 points"}
   ],
   "summary": "Solid resume with good experience. Minor improvements can boost visibility."
-}}"""
+}"""
+
+
+def minify_json(text):
+    """
+    Re-encode a JSON example without indentation or spaces. The model mirrors
+    the layout it is shown, so this trims whitespace tokens from both the
+    prompt and the reply.
+    """
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+
+
+# Minified once at import; the pieces above stay readable
+FULL_RESPONSE_FORMAT = minify_json("{\n" + _SCORES_FORMAT + "\n" + _KEYWORDS_FORMAT + ",\n" + _REVIEW_FORMAT)
+SCORING_RESPONSE_FORMAT = minify_json("{\n" + _SCORES_FORMAT + "\n" + _REVIEW_FORMAT)
+KEYWORD_RESPONSE_FORMAT = minify_json("{\n" + _KEYWORDS_FORMAT + "\n}")
+
+# With a job description the keyword match is asked for separately, in
+# parallel with the scoring request, so neither waits on the other's output
+KEYWORD_PROMPT_TEMPLATE = """Compare this resume against the job description. List the job's important skills and keywords that the resume contains and the ones it lacks, and rate how well the resume covers them (0-100).
+
+Resume:
+{resume}
+
+Job Description:
+{job_description}
+
+Respond with ONLY valid JSON:
+{response_format}"""
+
+SYSTEM_PROMPT = "You are a fair resume reviewer. Focus on what the candidate HAS accomplished, not what's missing. Be encouraging while providing actionable feedback. A decent resume should score at least 60-70."
+
+
+# Output ceilings sized to the expected JSON (~600 tokens for the full
+# analysis) so a rambling generation can't stretch the tail latency
+FULL_MAX_TOKENS = 800
+SCORING_MAX_TOKENS = 700
+KEYWORD_MAX_TOKENS = 400
+
 
+def request_analysis(prompt, max_tokens, api_key):
+    """
+    Run one streamed completion for prompt.
+
+    Returns (parsed, content); parsed is None if the reply held no valid JSON
+    object. Raises RuntimeError if the API answers with an error status.
+    """
+    request_data = REQUEST_ENCODER.encode({
+        "model": "llama3.3-70b-instruct",
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.3,
+        "stream": True,
+    }).encode('utf-8')
+    
+    conn, response = open_chat_completion(request_data, api_key)
     try:
-        request_data = json.dumps({
-            "model": "llama3.3-70b-instruct",
-            "messages": [
-                {"role": "system", "content": "You are a fair resume reviewer. Focus on what the candidate HAS accomplished, not what's missing. Be encouraging while providing actionable feedback. A decent resume should score at least 60-70."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 1500,
-            "temperature": 0.3,
-        }).encode('utf-8')
-        
-        req = urllib.request.Request(
-            "https://inference.do-ai.run/v1/chat/completions",
-            data=request_data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST"
-        )
-        
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-        
-        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        if response.status >= 400:
+            response.read()
+            raise RuntimeError(f"API error: {response.status}")
+        # Parse the JSON object as soon as it closes; anything the model
+        # writes after it is never waited for
+        content, json_text = read_streamed_json(response)
+    finally:
+        # Stopping early leaves the stream unread, so that connection
+        # can't carry the next request
+        release_connection(conn, response)
+    
+    if json_text is None:
+        return None, content
+    try:
+        return json.loads(json_text), content
+    except json.JSONDecodeError:
+        return None, content
+
+
+def main(args):
+    """
+    Balanced ATS analysis focusing on content quality over strict formatting
+    
+    Args:
+        resume_text: The extracted text from the resume
+        job_description: Optional job description for keyword matching
+    
+    Returns:
+        ats_score: Overall score (0-100)
+        section_scores: Individual section ratings
+        keyword_analysis: Keywords found and missing
+        recommendations: Prioritized improvement suggestions
+    """
+    resume_text = args.get("resume_text", "")
+    job_description = args.get("job_description", "")
+    
+    if not resume_text or len(resume_text.strip()) < 50:
+        return {
+            "statusCode": 400,
+            "body": {"error": "Resume text is required and must be at least 50 characters"}
+        }
+    
+    api_key = os.environ.get("DO_GENAI_API_KEY")
+    if not api_key:
+        return {
+            "statusCode": 500,
+            "body": {"error": "DO_GENAI_API_KEY not configured"}
+        }
+    
+    rejected = quick_reject(resume_text)
+    if rejected is not None:
+        return {
+            "statusCode": 200,
+            "body": {
+                "success": True,
+                **rejected
+            }
+        }
+    
+    # Surrounding whitespace does not change the key
+    key = cache_key(resume_text.strip(), job_description.strip())
+    cached = _analysis_cache.get(key)
+    if cached is not None:
+        return {
+            "statusCode": 200,
+            "body": {
+                "success": True,
+                **cached
+            }
+        }
+    
+    resume = compact_text(resume_text, RESUME_CHAR_BUDGET)
+    job_description = compact_text(job_description, JD_CHAR_BUDGET)
+    jd_block = ("Job Description for context:" + job_description) if job_description else ""
+
+    try:
+        if job_description:
+            # Scoring and keyword matching are independent; run them side by
+            # side so the wait is the slower of the two rather than their sum
+            keyword_prompt = KEYWORD_PROMPT_TEMPLATE.format(
+                resume=resume, job_description=job_description,
+                response_format=KEYWORD_RESPONSE_FORMAT)
+            keyword_future = _executor.submit(request_analysis, keyword_prompt, KEYWORD_MAX_TOKENS, api_key)
+            prompt = PROMPT_TEMPLATE.format(
+                resume=resume, jd_block=jd_block, response_format=SCORING_RESPONSE_FORMAT)
+            parsed, content = request_analysis(prompt, SCORING_MAX_TOKENS, api_key)
+            keywords, keyword_content = keyword_future.result()
+            if parsed is not None:
+                if keywords is None:
+                    parsed, content = None, keyword_content
+                else:
+                    parsed["keyword_analysis"] = keywords.get("keyword_analysis")
+        else:
+            prompt = PROMPT_TEMPLATE.format(
+                resume=resume, jd_block=jd_block, response_format=FULL_RESPONSE_FORMAT)
+            parsed, content = request_analysis(prompt, FULL_MAX_TOKENS, api_key)
         
-        # Parse JSON from response
-        try:
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                parsed = json.loads(content[json_start:json_end])
-                return {
-                    "statusCode": 200,
-                    "body": {
-                        "success": True,
-                        **parsed
-                    }
+        if parsed is not None:
+            _analysis_cache.put(key, parsed)
+            return {
+                "statusCode": 200,
+                "body": {
+                    "success": True,
+                    **parsed
                 }
-        except json.JSONDecodeError:
-            pass
+            }
         
         return {
             "statusCode": 200,
@@ -141,11 +298,6 @@ Respond with ONLY valid JSON:
             }
         }
         
-    except urllib.error.HTTPError as e:
-        return {
-            "statusCode": 500,
-            "body": {"error": f"API error: {e.code}"}
-        }
     except Exception as e:
         return {
             "statusCode": 500,
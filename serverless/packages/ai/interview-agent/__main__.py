@@ -2,8 +2,11 @@
 
 import os
 import json
-import urllib.request
-import urllib.error
+import random
+import hashlib
+from collections import OrderedDict
+
+from genai_common import REQUEST_ENCODER, ResponseCache, cache_key, post_chat_completion
 
 PERSONAS = {
     "friendly": {"name": "Alex", "style": "warm, encouraging"},
@@ -12,28 +15,162 @@ PERSONAS = {
     "challenging": {"name": "Michael", "style": "direct, challenging"}
 }
 
-def call_llm(api_key, messages, max_tokens=400):
-    data = json.dumps({
-        "model": "llama3.3-70b-instruct",
+
+def prefix_key(message):
+    """Stable id for a leading message; requests sharing it share a cacheable prefix"""
+    return hashlib.blake2b(message["content"].encode('utf-8'), digest_size=16).hexdigest()
+
+
+# Interview turns and feedback use the large model; mechanical JSON repair
+# goes to the small one
+MODEL = "llama3.3-70b-instruct"
+REPAIR_MODEL = os.environ.get("DO_GENAI_EASY_MODEL", "llama3-8b-instruct")
+
+
+def call_llm(api_key, messages, max_tokens=400, temperature=0.8, model=MODEL):
+    data = REQUEST_ENCODER.encode({
+        "model": model,
         "messages": messages,
-        "temperature": 0.8,
+        "temperature": temperature,
         "max_tokens": max_tokens,
+        # OpenAI-compatible routing hint: requests with the same system
+        # prompt land together, where their prefix is already cached
+        "user": prefix_key(messages[0]),
     }).encode('utf-8')
     
-    req = urllib.request.Request(
-        "https://inference.do-ai.run/v1/chat/completions",
-        data=data,
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-    )
-    
-    with urllib.request.urlopen(req, timeout=55) as response:
-        result = json.loads(response.read().decode('utf-8'))
+    response, body = post_chat_completion(data, api_key, timeout=55)
+    if response.status >= 400:
+        raise RuntimeError(f"API error: {response.status}")
+    result = json.loads(body)
     
     return result["choices"][0]["message"]["content"]
 
+
+# Only the most recent turns are resent, so per-turn prefill stays bounded
+# instead of growing with the whole interview (same window as the backend
+# interview service)
+HISTORY_TURNS = 12
+EARLIER_QUESTION_CHARS = 80
+FEEDBACK_TRANSCRIPT_CHARS = 3000
+
+
+def compact_history(history, keep=HISTORY_TURNS):
+    """
+    Last `keep` messages verbatim, preceded by a one-line note of the
+    questions asked before them so the interviewer doesn't repeat itself.
+    """
+    messages = []
+    older = history[:-keep] if len(history) > keep else []
+    asked = [m.get("content", "")[:EARLIER_QUESTION_CHARS] for m in older if m.get("role") == "assistant"]
+    if asked:
+        messages.append({"role": "system", "content": "Earlier in this interview you already asked: " + " | ".join(asked)})
+    for m in history[-keep:]:
+        messages.append({"role": m.get("role", "user"), "content": m.get("content", "")})
+    return messages
+
+
+def transcript_excerpt(history, max_chars=FEEDBACK_TRANSCRIPT_CHARS):
+    """Interviewer/Candidate transcript cut at a whole message, not mid-word"""
+    lines = []
+    used = 0
+    for m in history:
+        speaker = 'Interviewer' if m.get('role') == 'assistant' else 'Candidate'
+        line = f"{speaker}: {m.get('content', '')}"
+        if used + len(line) > max_chars:
+            if not lines:
+                lines.append(line[:max_chars])
+            break
+        lines.append(line)
+        used += len(line) + 1
+    return "\n".join(lines)
+
+
+# Persona part of each system message, filled in once at import; only the
+# job role is substituted per call
+SYSTEM_PROMPT_TEMPLATES = {
+    key: (f"You are {persona['name']}, a {persona['style']} interviewer for {{job_role}}. "
+          "Ask one question at a time. Keep under 150 words.")
+    for key, persona in PERSONAS.items()
+}
+
+
+def interviewer_system_prompt(persona_key, job_role):
+    """
+    System message shared by every turn of one interview.
+
+    It depends only on the persona and role, so each request starts with the
+    same bytes and the provider's automatic prefix cache can reuse the prefill
+    of the system message and the history that follows it.
+    """
+    template = SYSTEM_PROMPT_TEMPLATES.get(persona_key, SYSTEM_PROMPT_TEMPLATES["friendly"])
+    return template.format(job_role=job_role)
+
+
+# Responses keyed by a hash of their inputs. Results pages are refreshed and
+# retried often, and every miss costs a multi-second generation
+CACHE_TTL_SECONDS = 86400
+_response_cache = ResponseCache(CACHE_TTL_SECONDS)
+
+
+def feedback_errors(feedback):
+    """Problems with the feedback structure the frontend relies on; empty if valid"""
+    if not isinstance(feedback, dict):
+        return ["feedback must be a JSON object"]
+    errors = []
+    score = feedback.get("overall_score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+        errors.append("overall_score must be a number from 0 to 100")
+    for field in ("strengths", "improvements"):
+        items = feedback.get(field)
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            errors.append(f"{field} must be a list of strings")
+    return errors
+
+
+def repair_feedback(api_key, raw, errors):
+    """
+    One cheap pass on the small model to fix malformed feedback JSON.
+
+    Returns the repaired feedback, or None if it still isn't valid.
+    """
+    prompt = ("Here is a JSON object with errors: " + "; ".join(errors) + ".\n"
+              "Output only the corrected JSON object with overall_score (0-100), "
+              "strengths (list of strings) and improvements (list of strings):\n" + raw)
+    repaired = call_llm(api_key, [{"role": "user", "content": prompt}], 1000, temperature=0, model=REPAIR_MODEL)
+    try:
+        parsed = json.loads(repaired)
+    except ValueError:
+        return None
+    return parsed if not feedback_errors(parsed) else None
+
+
+# Openers kept per (persona, role). The first OPENER_VARIANTS starts for a
+# pair are generated normally; later ones reuse one of those at random, so
+# repeat practice runs skip the API call but don't all open identically
+OPENER_VARIANTS = 3
+OPENER_CACHE_MAX_ENTRIES = 128
+_openers = OrderedDict()
+
+
+def opening_message(persona_key, job_role, api_key):
+    """Greeting and warm-up question for a new interview"""
+    key = (persona_key, job_role)
+    pool = _openers.get(key)
+    if pool is not None and len(pool) >= OPENER_VARIANTS:
+        _openers.move_to_end(key)
+        return random.choice(pool)
+    messages = [
+        {"role": "system", "content": interviewer_system_prompt(persona_key, job_role)},
+        {"role": "user", "content": "Start with a greeting and warm-up question. Keep it under 100 words."}
+    ]
+    opening = call_llm(api_key, messages, 300)
+    _openers.setdefault(key, []).append(opening)
+    _openers.move_to_end(key)
+    if len(_openers) > OPENER_CACHE_MAX_ENTRIES:
+        _openers.popitem(last=False)
+    return opening
+
+
 def main(args):
     action = args.get("action", "respond")
     persona_key = args.get("persona", "friendly")
@@ -49,8 +186,7 @@ def main(args):
     
     try:
         if action == "start":
-            prompt = f"You are {persona['name']}, a {persona['style']} interviewer for {job_role}. Start with a greeting and warm-up question. Keep it under 100 words."
-            opening = call_llm(api_key, [{"role": "user", "content": prompt}], 300)
+            opening = opening_message(persona_key, job_role, api_key)
             return {
                 "statusCode": 200,
                 "body": {
@@ -62,13 +198,15 @@ def main(args):
             }
         
         elif action == "respond":
-            messages = [{"role": "system", "content": f"You are {persona['name']}, interviewing for {job_role}. Ask one question at a time. Keep under 150 words."}]
-            for m in history:
-                messages.append({"role": m.get("role", "user"), "content": m.get("content", "")})
+            # Static system message first, then the history in order, then the
+            # new turn: earlier turns stay a byte-identical prefix
+            messages = [{"role": "system", "content": interviewer_system_prompt(persona_key, job_role)}]
+            messages.extend(compact_history(history))
             messages.append({"role": "user", "content": user_message})
             
             response = call_llm(api_key, messages)
-            q_count = len([m for m in history if m.get("role") == "assistant"]) + 1
+            # Clients that track the question number pass it and skip the scan
+            q_count = args.get("question_number") or sum(1 for m in history if m.get("role") == "assistant") + 1
             
             return {
                 "statusCode": 200,
@@ -81,14 +219,33 @@ def main(args):
             }
         
         elif action == "feedback":
-            convo = "\n".join([f"{'Interviewer' if m.get('role')=='assistant' else 'Candidate'}: {m.get('content','')}" for m in history])
-            prompt = f"Analyze this {job_role} interview and give JSON feedback: overall_score (0-100), strengths (list), improvements (list).\n\n{convo[:3000]}"
+            convo = transcript_excerpt(history)
+            key = cache_key(job_role, convo)
+            cached = _response_cache.get(key)
+            if cached is not None:
+                return {"statusCode": 200, "body": cached}
+            
+            prompt = f"Analyze this {job_role} interview and give JSON feedback: overall_score (0-100), strengths (list), improvements (list).\n\n{convo}"
             
-            feedback = call_llm(api_key, [{"role": "user", "content": prompt}], 1000)
+            # Temperature 0: the result is cached and replayed for identical
+            # transcripts, so it shouldn't be one random sample
+            feedback = call_llm(api_key, [{"role": "user", "content": prompt}], 1000, temperature=0)
             try:
-                return {"statusCode": 200, "body": json.loads(feedback)}
-            except:
-                return {"statusCode": 200, "body": {"raw_response": feedback}}
+                parsed = json.loads(feedback)
+                errors = feedback_errors(parsed)
+            except ValueError:
+                parsed = None
+                errors = ["not valid JSON"]
+            if errors:
+                # Fix the structure on the small model rather than having the
+                # caller regenerate everything on the large one
+                repaired = repair_feedback(api_key, feedback, errors)
+                if repaired is None:
+                    body = parsed if parsed is not None else {"raw_response": feedback}
+                    return {"statusCode": 200, "body": body}
+                parsed = repaired
+            _response_cache.put(key, parsed)
+            return {"statusCode": 200, "body": parsed}
         
         else:
             return {"statusCode": 400, "body": {"error": f"Unknown action: {action}"}}
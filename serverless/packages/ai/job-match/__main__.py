@@ -5,8 +5,212 @@ Analyzes resume against job roles using DO GenAI to provide real match scores
 
 import os
 import json
-import urllib.request
-import urllib.error
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from genai_common import (
+    REQUEST_ENCODER, ResponseCache, cache_key, compact_text,
+    open_chat_completion, release_connection,
+)
+
+
+# One worker per role (at most MAX_ROLES); kept across warm invocations so
+# the threads are reused
+MAX_ROLES = 5
+_executor = ThreadPoolExecutor(max_workers=MAX_ROLES)
+
+
+class RateBucket:
+    """
+    Thread-safe leaky bucket allowing `rate` units per `per` seconds.
+
+    acquire() blocks until the cost fits, so parallel requests are paced
+    below the provider's limits instead of being answered with 429s. With a
+    deadline it raises RuntimeError rather than wait past it.
+    """
+
+    def __init__(self, rate, per=60.0):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self._level = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cost=1, deadline=None):
+        cost = min(cost, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._level = min(self.capacity, self._level + (now - self._updated) * self.fill_rate)
+                self._updated = now
+                if self._level >= cost:
+                    self._level -= cost
+                    return
+                wait = (cost - self._level) / self.fill_rate
+                if deadline is not None and now + wait > deadline:
+                    raise RuntimeError("Rate limit: no capacity left within the time budget")
+            time.sleep(wait)
+
+
+# Requests and tokens per minute allowed from one container
+_RPM = RateBucket(float(os.environ.get("DO_GENAI_RPM", "60")))
+_TPM = RateBucket(float(os.environ.get("DO_GENAI_TPM", "60000")))
+
+# Longest Retry-After honoured on a 429; the function itself times out at 30 s
+MAX_RETRY_AFTER = 10.0
+
+# Seconds this invocation may spend before the platform kills it (the
+# action's 30 s limit in project.yml, less a margin for the response)
+TIME_BUDGET_SECONDS = 27
+
+
+def retry_after_seconds(header):
+    """Delay asked for by a Retry-After header (seconds form), capped"""
+    try:
+        return min(max(float(header), 0.0), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return 1.0
+
+
+def post_chat_completion(request_data, api_key, deadline):
+    """
+    POST a chat completion over a kept-alive connection; returns (status, body bytes)
+
+    A dropped idle connection is reopened once, and a 429 is retried once
+    after the server's Retry-After delay if the retry can still start
+    before the deadline. Socket reads time out at the deadline.
+    """
+    throttled = False
+    while True:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise RuntimeError("Time budget exhausted")
+        conn, response = open_chat_completion(request_data, api_key, timeout)
+        try:
+            status, body = response.status, response.read()
+        finally:
+            release_connection(conn, response)
+        if status == 429 and not throttled:
+            throttled = True
+            delay = retry_after_seconds(response.getheader("Retry-After"))
+            if time.monotonic() + delay < deadline:
+                time.sleep(delay)
+                continue
+        return status, body
+
+
+# Models by task difficulty; job matching is routine structured extraction
+# and goes to the small, faster model first
+MODEL_TIERS = {
+    "easy": os.environ.get("DO_GENAI_EASY_MODEL", "llama3-8b-instruct"),
+    "hard": "llama3.3-70b-instruct",
+}
+
+
+REQUEST_MAX_TOKENS = 300
+
+
+def request_matches(prompt, model, api_key, deadline):
+    """
+    Ask `model` to score the role in prompt.
+
+    Returns (parsed, content); parsed is None if the reply held no valid JSON.
+    Raises RuntimeError if the API answers with an error status.
+    """
+    request_data = REQUEST_ENCODER.encode({
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "You are a career advisor AI. Analyze resumes and provide accurate job matching scores based on skills, experience, and qualifications."},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": REQUEST_MAX_TOKENS,
+        "temperature": 0.3,
+        # JSON mode: the decoder only emits a JSON object, so the reply parses
+        # as-is without locating the object inside surrounding prose
+        "response_format": {"type": "json_object"},
+    }).encode('utf-8')
+    
+    # Wait for both request and token capacity; tokens are estimated as the
+    # prompt bytes / 4 plus the completion ceiling
+    _RPM.acquire(deadline=deadline)
+    _TPM.acquire(len(request_data) // 4 + REQUEST_MAX_TOKENS, deadline=deadline)
+    status, body = post_chat_completion(request_data, api_key, deadline)
+    if status >= 400:
+        raise RuntimeError(f"API error: {status}")
+    result = json.loads(body)
+    
+    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+    
+    try:
+        return json.loads(content), content
+    except json.JSONDecodeError:
+        pass
+    
+    # Endpoints that ignore response_format may still wrap the object in prose
+    json_start = content.find('{')
+    json_end = content.rfind('}') + 1
+    if json_start >= 0 and json_end > json_start:
+        try:
+            return json.loads(content[json_start:json_end]), content
+        except json.JSONDecodeError:
+            pass
+    return None, content
+
+
+# Prompt budget for the resume, in characters (roughly 4 per token)
+RESUME_CHAR_BUDGET = 4000
+
+
+# Responses keyed by a hash of their inputs. Results pages are refreshed and
+# retried often, and every miss costs a multi-second generation
+CACHE_TTL_SECONDS = 86400
+_response_cache = ResponseCache(CACHE_TTL_SECONDS)
+
+
+# Resume first so every role's request shares the same leading tokens and
+# the provider's automatic prefix cache can reuse their prefill
+ROLE_PROMPT_TEMPLATE = """Resume:
+{resume}
+
+Rate how well this resume matches the job role: {role}
+
+Provide:
+1. match_percent (0-100): How well the resume matches
+2. strengths: 2-3 key strengths for this role
+3. gaps: 1-2 missing skills or experiences
+
+Respond with valid JSON only, as compact as this example:
+{{"role":"{role}","match_percent":85,"strengths":["Strong Python skills","Experience with APIs"],"gaps":["No cloud experience mentioned"]}}"""
+
+
+def match_role(resume, role, api_key, deadline):
+    """
+    Score one role: the small model first, the large one if the small model
+    errors or its reply has no valid JSON and a second call, allowed twice
+    as long as the first, still fits before the deadline.
+
+    Returns (match, content); match is None if neither reply parsed.
+    """
+    prompt = ROLE_PROMPT_TEMPLATE.format(resume=resume, role=role)
+    call_started = time.monotonic()
+    error = None
+    try:
+        match, content = request_matches(prompt, MODEL_TIERS["easy"], api_key, deadline)
+    except RuntimeError as e:
+        match, error = None, e
+    if match is None:
+        now = time.monotonic()
+        if now + 2 * (now - call_started) > deadline:
+            # No time left for the large model; report the small one's outcome
+            if error is not None:
+                raise error
+            return None, content
+        match, content = request_matches(prompt, MODEL_TIERS["hard"], api_key, deadline)
+    if not isinstance(match, dict):
+        return None, content
+    match.setdefault("role", role)
+    return match, content
 
 
 def main(args):
@@ -20,6 +224,7 @@ def main(args):
     Returns:
         job_matches: List of {role, match_percent, reasons, improvements}
     """
+    deadline = time.monotonic() + TIME_BUDGET_SECONDS
     resume_text = args.get("resume_text", "")
     target_roles = args.get("target_roles", [
         "Software Engineer",
@@ -45,92 +250,51 @@ def main(args):
             "body": {"error": "DO_GENAI_API_KEY not configured", "job_matches": []}
         }
     
-    # Build prompt for job matching
-    roles_list = ", ".join(target_roles[:5])  # Limit to 5 roles
+    resume = compact_text(resume_text, RESUME_CHAR_BUDGET)
+    roles = target_roles[:MAX_ROLES]  # Limit to 5 roles
+    
+    key = cache_key(resume, *roles)
+    cached = _response_cache.get(key)
+    if cached is not None:
+        return {"statusCode": 200, "body": cached}
     
-    prompt = f"""Analyze this resume and rate how well it matches each of these job roles: {roles_list}
-
-Resume:
-{resume_text[:4000]}
-
-For each role, provide:
-1. match_percent (0-100): How well the resume matches
-2. strengths: 2-3 key strengths for this role
-3. gaps: 1-2 missing skills or experiences
-
-Respond with valid JSON only:
-{{
-  "job_matches": [
-    {{
-      "role": "Software Engineer",
-      "match_percent": 85,
-      "strengths": ["Strong Python skills", "Experience with APIs"],
-      "gaps": ["No cloud experience mentioned"]
-    }}
-  ]
-}}"""
-
     try:
-        # Call DO GenAI API
-        request_data = json.dumps({
-            "model": "llama3.3-70b-instruct",
-            "messages": [
-                {"role": "system", "content": "You are a career advisor AI. Analyze resumes and provide accurate job matching scores based on skills, experience, and qualifications."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 1000,
-            "temperature": 0.3,
-        }).encode('utf-8')
-        
-        req = urllib.request.Request(
-            "https://inference.do-ai.run/v1/chat/completions",
-            data=request_data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST"
-        )
-        
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        # One short request per role, run in parallel: each decodes a single
+        # role's JSON instead of waiting for the whole list from one call
+        futures = [_executor.submit(match_role, resume, role, api_key, deadline) for role in roles]
+        results = []
+        errors = []
+        for future in futures:
+            # One role failing on both tiers shouldn't lose the roles that
+            # did come back
+            try:
+                results.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+        matches = [match for match, _ in results if match is not None]
+        if matches:
+            body = {
+                "success": True,
+                "job_matches": matches
+            }
+            # A partial answer is returned but not cached, so a retry can
+            # fill in the roles that failed
+            if not errors:
+                _response_cache.put(key, body)
+            return {"statusCode": 200, "body": body}
         
-        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-        
-        # Parse JSON from response
-        try:
-            # Find JSON in response
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                parsed = json.loads(content[json_start:json_end])
-                return {
-                    "statusCode": 200,
-                    "body": {
-                        "success": True,
-                        "job_matches": parsed.get("job_matches", [])
-                    }
-                }
-        except json.JSONDecodeError:
-            pass
+        if not results:
+            raise RuntimeError(errors[0])
         
         return {
             "statusCode": 200,
             "body": {
                 "error": "Failed to parse LLM response",
-                "raw_content": content[:500],
+                "raw_content": results[0][1][:500] if results else "",
                 "job_matches": []
             }
         }
         
-    except urllib.error.HTTPError as e:
-        return {
-            "statusCode": 500,
-            "body": {
-                "error": f"API error: {e.code}",
-                "job_matches": []
-            }
-        }
     except Exception as e:
         return {
             "statusCode": 500,
@@ -5,45 +5,70 @@ Returns structured JSON with personal info, experience, education, projects, ski
 """
 
 import os
+import html
 import json
-import urllib.request
-import urllib.error
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
+from genai_common import (
+    REQUEST_ENCODER, ResponseCache, compact_text,
+    open_chat_completion, read_streamed_json, release_connection,
+)
 
-def main(args):
+
+def request_section(request_data, api_key):
     """
-    Parse resume text into structured format for the Resume Builder
-    
-    Args:
-        resume_text: The extracted text from the resume
-    
-    Returns:
-        Structured resume data with all sections
+    Run one section's streamed completion.
+
+    Returns (status, content, json_text). json_text is None if the reply held
+    no JSON object; on an error status content is the response body.
     """
-    resume_text = args.get("resume_text", "")
-    
-    if not resume_text or len(resume_text.strip()) < 50:
-        return {
-            "statusCode": 400,
-            "body": {"error": "Resume text is required and must be at least 50 characters"}
-        }
-    
-    api_key = os.environ.get("DO_GENAI_API_KEY")
-    if not api_key:
-        return {
-            "statusCode": 500,
-            "body": {"error": "DO_GENAI_API_KEY not configured"}
-        }
-    
-    # Structured extraction prompt
-    prompt = f"""Parse this resume into a structured JSON format. Extract ALL information accurately.
+    conn, response = open_chat_completion(request_data, api_key, timeout=60)
+    try:
+        if response.status >= 400:
+            return response.status, response.read().decode('utf-8', 'replace'), None
+        if (response.getheader("Content-Type") or "").startswith("text/event-stream"):
+            # Parse the JSON object as soon as it closes; anything the model
+            # writes after it is never waited for
+            content, json_text = read_streamed_json(response)
+        else:
+            # The endpoint ignored "stream" and sent the whole completion; in
+            # JSON mode the content is the object itself
+            result = json.loads(response.read())
+            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+            json_text = content or None
+    finally:
+        # Stopping early leaves the stream unread, so that connection
+        # can't carry the next request
+        release_connection(conn, response)
+    return response.status, content, json_text
+
+
+# Parsed resumes keyed by a hash of the request bodies (model, messages,
+# temperature, max_tokens). The same upload is often parsed again on retries
+# and page reloads, and every miss costs a multi-second generation
+CACHE_TTL_SECONDS = 604800
+_response_cache = ResponseCache(CACHE_TTL_SECONDS)
+
+# Greedy decoding: the same resume always parses the same way, which is what
+# makes replaying a cached parse safe
+PARSE_TEMPERATURE = 0
+
 
-Resume Text:
-{resume_text[:10000]}
+# The resume goes first in every section prompt so the three requests share
+# their leading tokens and the provider's prefix cache can reuse the prefill.
+# Its lines are numbered so bullet text can be referenced instead of retyped.
+# Everything but the resume is built once here, so a request only concatenates
+PROMPT_HEADER = "Resume Text (each line prefixed with its [line number]):\n"
 
-Extract and return ONLY valid JSON with this exact structure:
-{{
-  "personal": {{
+PROMPT_RULES = """
+IMPORTANT:
+- Use empty string "" for missing fields, never null
+- Return ONLY the JSON, no explanation"""
+
+BASIC_PROMPT = """Extract the contact details from this resume and return ONLY valid JSON with this exact structure:
+{
+  "personal": {
     "name": "Full Name from resume",
     "title": "Job title or headline",
     "email": "email@example.com",
@@ -52,119 +77,294 @@ Extract and return ONLY valid JSON with this exact structure:
     "linkedin": "linkedin URL if present",
     "github": "github URL if present",
     "website": "portfolio URL if present"
-  }},
+  }
+}
+""" + PROMPT_RULES
+
+EXP_PROMPT = """Extract the work experience and projects from this resume and return ONLY valid JSON with this exact structure:
+{
   "experience": [
-    {{
+    {
       "company": "Company Name",
       "position": "Job Title",
       "date": "Start - End (e.g., Jan 2020 - Present)",
-      "details": "<ul><li>Achievement or responsibility 1</li><li>Achievement 2</li></ul>"
-    }}
+      "details_range": [15, 22]
+    }
   ],
+  "projects": [
+    {
+      "name": "Project Name",
+      "role": "Your role (optional)",
+      "date": "Date range",
+      "description_range": [30, 33],
+      "link": "Project URL if present"
+    }
+  ]
+}
+""" + PROMPT_RULES + """
+- For details_range/description_range give the first and last [line number] of the bullet points describing that entry; do not copy the bullet text
+- Extract ALL jobs and ALL projects mentioned"""
+
+EDU_PROMPT = """Extract the education and skills from this resume and return ONLY valid JSON with this exact structure:
+{
   "education": [
-    {{
+    {
       "school": "University Name",
       "degree": "Degree Type (e.g., Bachelor of Science)",
       "major": "Field of Study",
       "start_date": "Start year",
       "end_date": "End year or Expected",
       "gpa": "GPA if mentioned"
-    }}
-  ],
-  "projects": [
-    {{
-      "name": "Project Name",
-      "role": "Your role (optional)",
-      "date": "Date range",
-      "description": "<ul><li>What you built</li><li>Technologies used</li></ul>",
-      "link": "Project URL if present"
-    }}
+    }
   ],
   "skills_content": "<p><strong>Programming:</strong> Python, JavaScript, etc.</p><p><strong>Tools:</strong> Docker, AWS, etc.</p>"
-}}
+}
+""" + PROMPT_RULES + """
+- Extract ALL education entries mentioned"""
 
-IMPORTANT:
-- For bullet points in experience/projects, use HTML: <ul><li>point</li></ul>
-- Extract ALL jobs, ALL education entries, ALL projects mentioned
-- Use empty string "" for missing fields, never null
-- Return ONLY the JSON, no explanation"""
+# (section instructions, max_tokens, keys taken from the reply). Each section is
+# its own request, so decode time is the longest section rather than the sum
+SECTION_REQUESTS = [
+    (BASIC_PROMPT, 400, ("personal",)),
+    (EXP_PROMPT, 700, ("experience", "projects")),
+    (EDU_PROMPT, 800, ("education", "skills_content")),
+]
+
+# The experience/projects reply grows with the number of entries, which
+# tracks the resume's length: short resumes get a tighter ceiling, long ones
+# up to twice the default
+TOKENS_PER_LINE = 8
+
+
+def experience_max_tokens(max_tokens, line_count):
+    return min(2 * max_tokens, max(max_tokens // 2, TOKENS_PER_LINE * line_count))
+
+
+SUGGEST_PROMPT = """Review this resume and suggest improvements. Return ONLY valid JSON, as compact as this example:
+{"suggestions":[{"section":"experience","suggestion":"...","reason":"..."}],"overall_score":75}"""
+
+# Optional fourth request for callers that show suggestions right after
+# import: it runs alongside the sections on the same resume prefix instead of
+# a separate resume-suggestions call resubmitting the whole resume later
+SUGGEST_REQUEST = (SUGGEST_PROMPT, 600, ("suggestions", "overall_score"))
+
+# One worker per request; kept across warm invocations so the threads are reused
+_executor = ThreadPoolExecutor(max_workers=len(SECTION_REQUESTS) + 1)
+
+
+# Prompt budget for the resume, in characters (roughly 4 per token)
+RESUME_CHAR_BUDGET = 10000
 
+
+def number_lines(lines):
+    """Prefix each line with its 1-based [line number] for the prompt"""
+    return "\n".join(f"[{i:04d}] {line}" for i, line in enumerate(lines, 1))
+
+
+def lines_to_html(lines, line_range):
+    """
+    The resume lines in line_range ([first, last], 1-based, inclusive) as an
+    HTML bullet list; "" if the range is malformed or covers no text.
+    """
     try:
-        request_data = json.dumps({
-            "model": "openai-gpt-oss-120b",  # Larger model for better accuracy
-            "messages": [
-                {"role": "system", "content": "You are an expert resume parser. Extract structured data accurately from resumes. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": 3000,
-            "temperature": 0.1,
-        }).encode('utf-8')
-        
-        req = urllib.request.Request(
-            "https://inference.do-ai.run/v1/chat/completions",
-            data=request_data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            method="POST"
-        )
+        first, last = int(line_range[0]), int(line_range[1])
+    except (TypeError, ValueError, IndexError, KeyError):
+        return ""
+    items = []
+    for line in lines[max(first, 1) - 1:last]:
+        line = line.strip().lstrip("-•*▪●◦ ").strip()
+        if line:
+            items.append(f"<li>{html.escape(line)}</li>")
+    if not items:
+        return ""
+    return "<ul>" + "".join(items) + "</ul>"
+
+
+def fill_ranges(entries, range_key, text_key, lines):
+    """Replace each entry's range_key pointer with the HTML of the lines it covers"""
+    if not isinstance(entries, list):
+        return
+    for entry in entries:
+        if not isinstance(entry, dict) or range_key not in entry:
+            continue
+        entry[text_key] = lines_to_html(lines, entry.pop(range_key))
+
+
+# Resume parsing is bounded structured extraction; the small model handles it
+# at several times the decode speed. PARSER_MODEL_TIER=accurate starts on the
+# large model instead
+MODEL_TIERS = {
+    "fast": "openai-gpt-oss-20b",
+    "accurate": "openai-gpt-oss-120b",
+}
+PARSER_MODEL_TIER = os.environ.get("PARSER_MODEL_TIER", "fast")
+if PARSER_MODEL_TIER not in MODEL_TIERS:
+    PARSER_MODEL_TIER = "fast"
+
+# One worked example grounds the small model on field names and line ranges
+SYSTEM_PROMPT = """You are an expert resume parser. Extract structured data accurately from resumes. Return only valid JSON, with only the fields the request asks for.
+
+Example input:
+[0001] John Doe
+[0002] john@doe.dev | San Francisco, CA
+[0003] EXPERIENCE
+[0004] Acme Inc - Backend Engineer, Jun 2020 - Present
+[0005] - Built billing APIs in Python
+[0006] - Cut p95 latency 40%
+[0007] EDUCATION
+[0008] BS Computer Science, Stanford University, 2016 - 2020
+Example output, all fields:
+{"personal":{"name":"John Doe","title":"Backend Engineer","email":"john@doe.dev","phone":"","location":"San Francisco, CA","linkedin":"","github":"","website":""},"experience":[{"company":"Acme Inc","position":"Backend Engineer","date":"Jun 2020 - Present","details_range":[5,6]}],"education":[{"school":"Stanford University","degree":"BS","major":"Computer Science","start_date":"2016","end_date":"2020","gpa":""}],"projects":[],"skills_content":""}"""
+
+
+def build_request(prompt, max_tokens, model):
+    return REQUEST_ENCODER.encode({
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        "max_tokens": max_tokens,
+        "temperature": PARSE_TEMPERATURE,
+        "stream": True,
+        # JSON mode: the decoder only emits a JSON object, so no prose
+        # surrounds it
+        "response_format": {"type": "json_object"},
+    }).encode('utf-8')
+
+
+def parse_section(prompt, max_tokens, api_key):
+    """
+    Run one section on the configured model tier, retrying on the accurate
+    model if the fast one errors or its reply has no valid JSON object.
+    A reply that didn't parse was often cut off at max_tokens, so that retry
+    gets twice the ceiling.
+
+    Returns (status, content, fragment); fragment is None if no reply parsed.
+    """
+    tiers = [PARSER_MODEL_TIER]
+    if PARSER_MODEL_TIER != "accurate":
+        tiers.append("accurate")
+    for tier in tiers:
+        request_data = build_request(prompt, max_tokens, MODEL_TIERS[tier])
+        status, content, json_text = request_section(request_data, api_key)
+        if status >= 400:
+            continue
+        try:
+            fragment = json.loads(json_text) if json_text is not None else None
+        except json.JSONDecodeError:
+            fragment = None
+        if isinstance(fragment, dict):
+            return status, content, fragment
+        max_tokens *= 2
+    return status, content, None
+
+
+def main(args):
+    """
+    Parse resume text into structured format for the Resume Builder
+    
+    Args:
+        resume_text: The extracted text from the resume
+        include_suggestions: Also return improvement suggestions and an
+            overall_score, as resume-suggestions would
+    
+    Returns:
+        Structured resume data with all sections
+    """
+    resume_text = args.get("resume_text", "")
+    sections = SECTION_REQUESTS
+    if args.get("include_suggestions"):
+        sections = SECTION_REQUESTS + [SUGGEST_REQUEST]
+    
+    if not resume_text or len(resume_text.strip()) < 50:
+        return {
+            "statusCode": 400,
+            "body": {"error": "Resume text is required and must be at least 50 characters"}
+        }
+    
+    api_key = os.environ.get("DO_GENAI_API_KEY")
+    if not api_key:
+        return {
+            "statusCode": 500,
+            "body": {"error": "DO_GENAI_API_KEY not configured"}
+        }
+    
+    lines = compact_text(resume_text, RESUME_CHAR_BUDGET).splitlines()
+    resume = number_lines(lines)
+    
+    try:
+        prompts = [PROMPT_HEADER + resume + "\n\n" + instructions for instructions, _, _ in sections]
+        budgets = [
+            experience_max_tokens(max_tokens, len(lines)) if instructions is EXP_PROMPT else max_tokens
+            for instructions, max_tokens, _ in sections
+        ]
         
-        with urllib.request.urlopen(req, timeout=60) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        # Keyed on the first-tier requests; an escalated reply is cached
+        # under the same key
+        digest = hashlib.sha256()
+        for prompt, max_tokens in zip(prompts, budgets):
+            digest.update(build_request(prompt, max_tokens, MODEL_TIERS[PARSER_MODEL_TIER]))
+        key = digest.digest()
+        cached = _response_cache.get(key)
+        if cached is not None:
+            return {"statusCode": 200, "body": cached}
         
-        content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        replies = list(_executor.map(
+            lambda prompt, max_tokens: parse_section(prompt, max_tokens, api_key),
+            prompts,
+            budgets,
+        ))
         
-        # Parse JSON from response
-        try:
-            # Find JSON in response
-            json_start = content.find('{')
-            json_end = content.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                parsed = json.loads(content[json_start:json_end])
-                
-                # Validate required structure
-                if "personal" not in parsed:
-                    parsed["personal"] = {}
-                if "experience" not in parsed:
-                    parsed["experience"] = []
-                if "education" not in parsed:
-                    parsed["education"] = []
-                if "projects" not in parsed:
-                    parsed["projects"] = []
-                if "skills_content" not in parsed:
-                    parsed["skills_content"] = ""
-                
+        parsed = {}
+        complete = True
+        for section, (status, content, fragment) in zip(sections, replies):
+            if section is SUGGEST_REQUEST and fragment is None:
+                # Suggestions are extra; a failed one doesn't fail the parse,
+                # but the incomplete result isn't cached
+                complete = False
+                continue
+            if status >= 400:
+                return {
+                    "statusCode": 500,
+                    "body": {"error": f"API error: {status}", "details": content[:500]}
+                }
+            if fragment is None:
                 return {
                     "statusCode": 200,
                     "body": {
-                        "success": True,
-                        **parsed
+                        "error": "No valid JSON found in LLM response",
+                        "raw_content": content[:1000]
                     }
                 }
-        except json.JSONDecodeError as e:
-            return {
-                "statusCode": 200,
-                "body": {
-                    "error": f"Failed to parse LLM response: {str(e)}",
-                    "raw_content": content[:1000]
-                }
-            }
+            for name in section[2]:
+                if name in fragment:
+                    parsed[name] = fragment[name]
         
-        return {
-            "statusCode": 200,
-            "body": {
-                "error": "No valid JSON found in LLM response",
-                "raw_content": content[:1000]
-            }
-        }
+        # Bullet text is copied from the resume rather than generated
+        fill_ranges(parsed.get("experience"), "details_range", "details", lines)
+        fill_ranges(parsed.get("projects"), "description_range", "description", lines)
         
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode('utf-8') if e.fp else str(e)
-        return {
-            "statusCode": 500,
-            "body": {"error": f"API error: {e.code}", "details": error_body[:500]}
+        # Validate required structure
+        if "personal" not in parsed:
+            parsed["personal"] = {}
+        if "experience" not in parsed:
+            parsed["experience"] = []
+        if "education" not in parsed:
+            parsed["education"] = []
+        if "projects" not in parsed:
+            parsed["projects"] = []
+        if "skills_content" not in parsed:
+            parsed["skills_content"] = ""
+        
+        body = {
+            "success": True,
+            **parsed
         }
+        if complete:
+            _response_cache.put(key, body)
+        return {"statusCode": 200, "body": body}
+        
     except Exception as e:
         return {
             "statusCode": 500,
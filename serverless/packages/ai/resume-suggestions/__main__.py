@@ -1,12 +1,82 @@
 """Resume AI Suggestions - DigitalOcean Serverless Function"""
 
 import os
+import re
+import gzip
 import json
-import urllib.request
-import urllib.error
+import time
+import http.client
+
+from genai_common import REQUEST_ENCODER, compact_text, post_chat_completion
+
+# Prompt budget for the resume, in characters (roughly 4 per token)
+RESUME_CHAR_BUDGET = 4000
+
+# Completion bodies are repetitive JSON and shrink several times over
+GZIP_HEADERS = {"Accept-Encoding": "gzip"}
+
+
+# Budget for a single section when the caller asks about just one
+SECTION_CHAR_BUDGET = 2000
+
+# A header is a line holding only the section name (optionally followed by a
+# colon), so body lines like "Experience with Python" don't split a section
+SECTION_HEADER_RE = re.compile(
+    r'^[^\S\n]*(EDUCATION|EXPERIENCE|WORK[^\S\n]+HISTORY|SKILLS|PROJECTS|SUMMARY|OBJECTIVE)[^\S\n]*:?[^\S\n]*$',
+    re.I | re.M,
+)
+
+# Header variants filed under the section name callers ask for
+SECTION_ALIASES = {"WORK HISTORY": "EXPERIENCE", "OBJECTIVE": "SUMMARY"}
+
+
+def split_text_into_sections(text):
+    """Map each upper-cased section header to its text, up to the next header"""
+    sections = {}
+    matches = list(SECTION_HEADER_RE.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(text)
+        name = ' '.join(match.group(1).upper().split())
+        name = SECTION_ALIASES.get(name, name)
+        # A header can repeat (e.g. two EXPERIENCE blocks); keep both
+        sections[name] = sections.get(name, '') + text[match.start():end]
+    return sections
+
+
+def build_context_snippet(resume_text, section):
+    """
+    The resume text to put in the prompt: the requested section alone when
+    one is named and found, otherwise the whole resume.
+    """
+    if section.lower() != "all":
+        snippet = split_text_into_sections(resume_text).get(section.upper())
+        if snippet:
+            return compact_text(snippet, SECTION_CHAR_BUDGET)
+    return compact_text(resume_text, RESUME_CHAR_BUDGET)
+
+
+# Fixed instructions go in the system message, ahead of the resume, so every
+# request starts with the same tokens and the provider's prefix cache can
+# reuse their prefill; the user message carries only what varies
+SYSTEM_PROMPT = """Analyze the resume you are given and provide improvement suggestions in JSON format.
+
+Return ONLY valid JSON, as compact as this example:
+{"suggestions":[{"section":"experience","suggestion":"...","reason":"..."}],"overall_score":75}"""
+
+
+# A single section needs fewer suggestions than the whole resume
+MAX_TOKENS = 1500
+SECTION_MAX_TOKENS = 800
+
+# Seconds this invocation may spend before the platform kills it (the
+# action's 30 s limit in project.yml, less a margin for the response)
+TIME_BUDGET_SECONDS = 27
+
 
 def main(args):
+    started = time.monotonic()
     resume_text = args.get("resume_text", "")
+    section = args.get("section") or "all"
     if not resume_text:
         return {"statusCode": 400, "body": {"error": "resume_text is required"}}
     
@@ -14,34 +84,44 @@ def main(args):
     if not api_key:
         return {"statusCode": 500, "body": {"error": "API key not configured"}}
     
-    prompt = f"""Analyze this resume and provide improvement suggestions in JSON format:
-Resume: {resume_text[:4000]}
+    focus = "" if section.lower() == "all" else f"Focus on the {section.lower()} section.\n"
+    prompt = focus + "Resume: " + build_context_snippet(resume_text, section)
 
-Return ONLY valid JSON:
-{{"suggestions": [{{"section": "experience", "suggestion": "...", "reason": "..."}}], "overall_score": 75}}"""
+    max_tokens = MAX_TOKENS if section.lower() == "all" else SECTION_MAX_TOKENS
 
     try:
-        data = json.dumps({
-            "model": "llama3.3-70b-instruct",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.7,
-            "max_tokens": 1500,
-        }).encode('utf-8')
-        
-        req = urllib.request.Request(
-            "https://inference.do-ai.run/v1/chat/completions",
-            data=data,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-        )
-        
-        with urllib.request.urlopen(req, timeout=25) as response:
-            result = json.loads(response.read().decode('utf-8'))
-        
-        if "error" in result:
-            return {"statusCode": 500, "body": {"error": str(result["error"])}}
+        for attempt in range(2):
+            call_started = time.monotonic()
+            data = REQUEST_ENCODER.encode({
+                "model": "llama3.3-70b-instruct",
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "temperature": 0.7,
+                "max_tokens": max_tokens,
+            }).encode('utf-8')
+            
+            response, body = post_chat_completion(data, api_key, timeout=25, headers=GZIP_HEADERS)
+            if response.getheader("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            status = response.status
+            if status >= 400:
+                return {"statusCode": 500, "body": {"error": f"HTTP {status}: {http.client.responses.get(status, '')}"}}
+            result = json.loads(body)
+            
+            if "error" in result:
+                return {"statusCode": 500, "body": {"error": str(result["error"])}}
+            
+            # A reply cut off at max_tokens is unparseable JSON; retry once
+            # with room to finish, but only if decoding twice as much (about
+            # twice as long) still fits in the time left
+            if result["choices"][0].get("finish_reason") != "length":
+                break
+            now = time.monotonic()
+            if now - started + 2 * (now - call_started) > TIME_BUDGET_SECONDS:
+                break
+            max_tokens *= 2
         
         content = result["choices"][0]["message"]["content"]
         
@@ -51,7 +131,5 @@ Return ONLY valid JSON:
         except:
             return {"statusCode": 200, "body": {"raw_response": content}}
         
-    except urllib.error.HTTPError as e:
-        return {"statusCode": 500, "body": {"error": f"HTTP {e.code}: {e.reason}"}}
     except Exception as e:
         return {"statusCode": 500, "body": {"error": str(e)}}